@@ -0,0 +1,163 @@
+# times each stage of the 3DO/3DT parsing on synthetic files, without Blender
+# usage: python benchmarks/runBenchmarks.py [--meshes 200] [--repeats 5] [--check] [--output results.json]
+# run from blender to also time building the mesh with and without fast mesh build:
+# blender --background --python benchmarks/runBenchmarks.py -- [--meshes 200] ...
+import os # for path stuff
+import sys
+import io
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from itertools import chain
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from omikronImporter.omikronFormat import *
+from syntheticFiles import writeSyntheticFiles, Compress, syntheticIndexTexture
+
+def timeStage(function, repeats):
+    #min and median over repeats, and the result of the last one
+    times = []
+    result = None
+    for i in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "repeats": repeats}, result
+
+def benchmarkModel(modelFilePath, repeats):
+    results = dict()
+    with open(modelFilePath, "rb") as model_in:
+        data = model_in.read()
+
+    def header():
+        file_object = io.BytesIO(data)
+        header = readHeader(file_object)
+        materials = readMaterials(file_object, header)
+        meshDescriptors = readMeshDescriptors(file_object, header)
+        assignDataOffsets(meshDescriptors)
+        return header, materials, meshDescriptors
+    results["header"], (header, materials, meshDescriptors) = timeStage(header, repeats)
+
+    results["vertices"], rawVertices = timeStage(lambda: loadVertexArrays(io.BytesIO(data), header, meshDescriptors), repeats)
+
+    def polygons():
+        file_object = io.BytesIO(data)
+        return [LoadMeshPolygons(header, meshDescriptor, file_object) for meshDescriptor in meshDescriptors if meshDescriptor["flags"] & invisible == 0]
+    results["polygons"], meshes = timeStage(polygons, repeats)
+
+    modelData = {"meshes": meshes, "parents_hierarchy": GenerateParentTable(meshDescriptors), "parents_skin": GenerateSkinTable(meshDescriptors),
+        "vertexRanges": keepVertexRanges(meshDescriptors)[0]}
+    results["skin"], _ = timeStage(lambda: DetermineSkin(modelData), repeats)
+
+    shaders = enumerateMaterials(meshes)
+    vertices = BuildVertices(meshDescriptors, rawVertices, computeMeshCenter(meshDescriptors))
+    results["faces"], (faces, UVs, materialIDs) = timeStage(lambda: buildPolygons(modelData, meshDescriptors, materials, shaders), repeats)
+
+    loopVertices = np.fromiter(chain.from_iterable(faces), dtype=np.int64)
+    loopTotals = np.array([len(face) for face in faces], dtype=np.int32)
+    results["duplicateFaces"], _ = timeStage(lambda: fixDuplicateFaces(loopVertices, loopTotals, len(vertices)), repeats)
+
+    results["parseModel"], modelData = timeStage(lambda: ParseModel(io.BytesIO(data), "SYNTHETIC"), repeats)
+    return results, modelData
+
+def benchmarkTextures(textureFilePath, materials, repeats):
+    results = dict()
+    with open(textureFilePath, "rb") as textures_in:
+        data = textures_in.read()
+    offsets = textureOffsets(materials)
+
+    def decompress():
+        file_object = io.BytesIO(data)
+        indexTextures = []
+        for material, offset in zip(materials, offsets):
+            file_object.seek(offset + 2**material["BPP"] * 3)
+            indexTextures.append(Decompress(file_object, material["dataSize"], material["width"] * material["height"]))
+        return indexTextures
+    results["decompress"], indexTextures = timeStage(decompress, repeats)
+
+    palettes = []
+    for material, offset in zip(materials, offsets):
+        file_object = io.BytesIO(data)
+        file_object.seek(offset)
+        palettes.append(ReadPalette(file_object, 2**material["BPP"]))
+    results["palette"], _ = timeStage(lambda: [ApplyPalette(palette, indexTexture) for palette, indexTexture in zip(palettes, indexTextures)], repeats)
+    return results
+
+def benchmarkMeshBuild(modelData, repeats):
+    #fillMeshBuffers against fillMeshPerLoop, which the fast_mesh_build option picks between. only inside blender
+    try:
+        import bpy
+    except ImportError:
+        return dict()
+    from omikronImporter.blenderImporter import fillMeshBuffers, fillMeshPerLoop
+    results = dict()
+    meshBuffers = [modelData[name] for name in MODEL_ARRAYS]
+    for name, fill in (("meshBuildBuffers", fillMeshBuffers), ("meshBuildPerLoop", fillMeshPerLoop)):
+        meshes = []
+        def build():
+            mesh = bpy.data.meshes.new("SYNTHETIC")
+            meshes.append(mesh)
+            fill(mesh, *meshBuffers)
+        results[name], _ = timeStage(build, repeats)
+        for mesh in meshes:
+            bpy.data.meshes.remove(mesh)
+    return results
+
+def checkRoundTrip(textureSize, count = 20):
+    #encodes random textures and makes sure Decompress gives them back
+    import random
+    rnd = random.Random(1)
+    for i in range(count):
+        indexTexture = syntheticIndexTexture(rnd, textureSize, textureSize)
+        compressed = Compress(indexTexture)
+        if bytes(Decompress(io.BytesIO(compressed), len(compressed), len(indexTexture))) != indexTexture:
+            raise ValueError("texture {0} did not survive compression".format(i))
+
+def main(arguments = None):
+    parser = argparse.ArgumentParser(description="Benchmark the Omikron 3DO/3DT parser on synthetic files")
+    parser.add_argument("--meshes", type=int, default=200)
+    parser.add_argument("--vertices", type=int, default=300, help="vertices per mesh, at most 1024")
+    parser.add_argument("--triangles", type=int, default=200, help="triangles per mesh")
+    parser.add_argument("--rectangles", type=int, default=150, help="rectangles per mesh")
+    parser.add_argument("--materials", type=int, default=16)
+    parser.add_argument("--texture-size", type=int, default=256, help="width and height of the textures, at most 256")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="also verify the synthetic textures decompress to what was encoded")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    if arguments is None and "--" in sys.argv:
+        arguments = sys.argv[sys.argv.index("--") + 1:] #blender's own arguments come before --
+    options = parser.parse_args(arguments)
+    if not 1 <= options.texture_size <= 256:
+        parser.error("--texture-size must be between 1 and 256, UVs are single bytes")
+
+    with tempfile.TemporaryDirectory() as directory:
+        modelFilePath = os.path.join(directory, "SYNTHETIC.3do")
+        writeSyntheticFiles(modelFilePath, options.meshes, options.vertices, options.triangles, options.rectangles,
+            options.materials, options.texture_size, seed=options.seed)
+
+        if options.check:
+            checkRoundTrip(options.texture_size)
+
+        modelResults, modelData = benchmarkModel(modelFilePath, options.repeats)
+        textureResults = benchmarkTextures(modelFilePath[:-3] + "3dt", modelData["materials"], options.repeats)
+        meshBuildResults = benchmarkMeshBuild(modelData, options.repeats)
+
+    report = {
+        "settings": vars(options),
+        "model": {"meshes": len(modelData["meshDescriptors"]), "vertices": len(modelData["vertices"]), "faces": len(modelData["loopTotals"]), "textures": len(modelData["materials"])},
+        "stages": dict(modelResults, **textureResults, **meshBuildResults),
+    }
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w") as results_out:
+            results_out.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# writes synthetic 3DO/3DT files, following the layouts read by omikronFormat, to benchmark the importer
+import os # for path stuff
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from omikronImporter.omikronFormat import *
+from omikronImporter.omikronFormat import HEADER_STRUCT, HEADER_FIELDS, MATERIAL_STRUCT, MESH_DESCRIPTOR_STRUCT, VERTEX_STRUCT, TRIANGLE_STRUCT, RECTANGLE_STRUCT
+
+HEADER_SIZE = HEADER_STRUCT.size
+
+def encodeString(text, length = 20):
+    return text.encode("cp858")[:length]
+
+def Compress(indexTexture):
+    #greedy encoder for the scheme read by Decompress, emitting all four sequence types
+    data = bytes(indexTexture)
+    tokens = [] #(is a sequence, encoded bytes)
+    lastPositions = dict() #last position of each 3 byte string
+    i = 1
+    while i < len(data):
+        length = 1
+        token = (False, data[i:i + 1])
+
+        run = 0
+        while i + run < len(data) and run < 65 and data[i + run] == data[i - 1]:
+            run += 1
+        if run >= 2:
+            length = run
+            token = (True, bytes([(run - 2) << 2]))
+
+        candidate = lastPositions.get(data[i:i + 3])
+        if candidate is not None and i - candidate <= 65536:
+            offset = i - candidate
+            match = 0
+            while i + match < len(data) and match < 66 and data[candidate + match] == data[i + match]:
+                match += 1
+            if match >= 3 and match > length:
+                length = match
+                if offset <= 256:
+                    token = (True, bytes([((match - 3) << 2) | 1, offset - 1]))
+                elif offset % 256 == 0 and offset // 256 < 256:
+                    token = (True, bytes([((match - 3) << 2) | 3, offset // 256]))
+                else:
+                    token = (True, bytes([((match - 3) << 2) | 2, (offset - 1) >> 8, (offset - 1) & 255]))
+
+        for position in range(i, i + length):
+            lastPositions[data[position:position + 3]] = position
+        tokens.append(token)
+        i += length
+
+    compressed = bytearray(data[:1]) # first byte isn't compressed
+    for groupStart in range(0, len(tokens), 8):
+        group = tokens[groupStart:groupStart + 8]
+        flags = 0
+        for flagIndex, (isSequence, encoded) in enumerate(group):
+            if isSequence:
+                flags |= 0x80 >> flagIndex
+        compressed.append(flags)
+        for isSequence, encoded in group:
+            compressed += encoded
+    if len(data) == 65536 and len(compressed) >= 65536:
+        #65536 bytes means uncompressed to the reader, which only fits 256x256 textures
+        compressed = bytearray(data)
+    elif len(compressed) == 65536:
+        #would be read as uncompressed. the reader stops at the last pixel, before the extra byte
+        compressed.append(0)
+    return bytes(compressed)
+
+def syntheticIndexTexture(rnd, width, height):
+    #mix of runs, repeated patterns and noise, like hand painted palettized textures
+    pixels = bytearray()
+    while len(pixels) < width * height:
+        choice = rnd.random()
+        if choice < 0.4:
+            pixels += bytes([rnd.randrange(256)]) * rnd.randint(2, 40)
+        elif choice < 0.7 and len(pixels) > width:
+            start = len(pixels) - rnd.choice([width, 1 + rnd.randrange(min(len(pixels), 4096))])
+            length = rnd.randint(3, 60)
+            for j in range(length):
+                pixels.append(pixels[start + j])
+        else:
+            pixels += bytes(rnd.randrange(256) for j in range(rnd.randint(1, 8)))
+    return bytes(pixels[:width * height])
+
+def writeSyntheticFiles(modelFilePath, meshCount = 100, verticesPerMesh = 300, trianglesPerMesh = 200, rectanglesPerMesh = 150,
+        materialCount = 8, textureSize = 128, duplicateRatio = 0.02, seed = 0):
+    #writes modelFilePath and its matching 3DT. vertex indices of a mesh are masked with 1023 by the reader, so at most 1024 vertices per mesh
+    #UVs are single bytes, so textures are at most 256 pixels wide
+    if not 1 <= textureSize <= 256:
+        raise ValueError("texture size {0} is not between 1 and 256".format(textureSize))
+    rnd = random.Random(seed)
+    verticesPerMesh = min(max(verticesPerMesh, 4), 1024)
+
+    materials = []
+    textureData = bytearray()
+    for materialIndex in range(materialCount):
+        palette = bytes(rnd.randrange(256) for j in range(256 * 3))
+        compressed = Compress(syntheticIndexTexture(rnd, textureSize, textureSize))
+        materials.append(MATERIAL_STRUCT.pack(encodeString("texture%d" % materialIndex), encodeString("texture%d.bmp" % materialIndex),
+            encodeString("texture%d.tga" % materialIndex), len(compressed), 0, 8, textureSize, textureSize))
+        textureData += palette + compressed
+
+    descriptors = bytearray()
+    vertexData = bytearray()
+    triangleData = bytearray()
+    rectangleData = bytearray()
+    totals = [0, 0, 0]
+    for meshIndex in range(meshCount):
+        parentID = -1 if meshIndex == 0 else rnd.randrange(meshIndex)
+        flags = rnd.choice([0, vertexLit, alphaTesting, alphablending | additive]) if meshIndex > 0 else 0
+        position = [rnd.uniform(-20000, 20000) for j in range(3)]
+        descriptors += MESH_DESCRIPTOR_STRUCT.pack(flags, 0, meshIndex, 0, encodeString("mesh%d" % meshIndex),
+            *position, parentID, -1, -1, 0, verticesPerMesh, trianglesPerMesh, rectanglesPerMesh,
+            0.0, 0.0, 0.0, 0.0, -100.0, -100.0, -100.0, 100.0, 100.0, 100.0, 0.0, 0.0, 0.0, *position)
+
+        for vertexIndex in range(verticesPerMesh):
+            normal = [rnd.uniform(-1, 1) for j in range(3)]
+            vertexData += VERTEX_STRUCT.pack(*[rnd.uniform(-100, 100) for j in range(3)], *normal, 0, *[rnd.randrange(256) for j in range(4)])
+
+        previous = None
+        for triangleIndex in range(trianglesPerMesh):
+            if previous is not None and rnd.random() < duplicateRatio:
+                indices = list(reversed(previous))
+            else:
+                indices = rnd.sample(range(verticesPerMesh), 3)
+            previous = indices
+            encoded = [index | 0x8000 if meshIndex > 0 and rnd.random() < 0.01 else index for index in indices] #a few vertices from the parent, as in skinned models
+            triangleData += TRIANGLE_STRUCT.pack(*encoded, *[rnd.randrange(textureSize) for j in range(6)], rnd.randrange(materialCount), 0, 0, 0)
+
+        for rectangleIndex in range(rectanglesPerMesh):
+            indices = rnd.sample(range(verticesPerMesh), 4)
+            rectangleData += RECTANGLE_STRUCT.pack(*indices, *[rnd.randrange(textureSize) for j in range(8)], rnd.randrange(materialCount), 0, 0, 0)
+
+        totals[0] += verticesPerMesh
+        totals[1] += trianglesPerMesh
+        totals[2] += rectanglesPerMesh
+
+    header = dict.fromkeys(HEADER_FIELDS, 0)
+    header["signature"] = b"3DO\x00"
+    header["reserved"] = bytes(180)
+    header["unknown4"] = bytes(84)
+    header["materialsOffset"] = HEADER_SIZE
+    header["meshesOffset"] = header["materialsOffset"] + len(materials) * MATERIAL_STRUCT.size
+    header["verticesOffset"] = header["meshesOffset"] + len(descriptors)
+    header["trianglesOffset"] = header["verticesOffset"] + len(vertexData)
+    header["rectanglesOffset"] = header["trianglesOffset"] + len(triangleData)
+    header["lightsOffset"] = header["rectanglesOffset"] + len(rectangleData)
+    header["vertexCount"], header["triangleCount"], header["rectangleCount"] = totals
+    header["materialCount"] = materialCount
+    header["meshCount"] = meshCount
+
+    with open(modelFilePath, "wb") as model_out:
+        model_out.write(HEADER_STRUCT.pack(*[header[field] for field in HEADER_FIELDS]))
+        for material in materials:
+            model_out.write(material)
+        model_out.write(descriptors)
+        model_out.write(vertexData)
+        model_out.write(triangleData)
+        model_out.write(rectangleData)
+
+    with open(modelFilePath[:-3] + "3dt", "wb") as textures_out:
+        textures_out.write(textureData)
@@ -0,0 +1,21 @@
+bl_info = {
+    "name": "Import Omikron models",
+    "author": "Chev",
+    "version": (0,1),
+    "blender": (2, 93, 1),
+    "location": "File > Export > Omikron model (*.3DO)",
+    "description": 'Import models from "Omikron: the Nomad Soul"',
+    "warning": "",
+    "wiki_url": "https://github.com/Chevluh/Omikron_Blender_Importer",
+    "category": "Import-Export"
+}
+
+#the blender side is only imported on registration. this keeps the parsing modules importable
+#without blender, which the worker processes used for multi-file imports rely on
+def register():
+    from . import blenderImporter
+    blenderImporter.register()
+
+def unregister():
+    from . import blenderImporter
+    blenderImporter.unregister()
@@ -0,0 +1,628 @@
+import bpy
+from bpy_extras.io_utils import ImportHelper
+from bpy.props import StringProperty, BoolProperty, IntProperty, FloatProperty, EnumProperty, FloatVectorProperty
+from mathutils import *
+import os # for path stuff
+import numpy as np
+
+from bpy.props import CollectionProperty #for multiple files
+from bpy.types import OperatorFileListElement
+
+from .omikronWorkers import *
+from . import deferredTextures
+from .sharedMaterials import SharedDatablocks, materialKey
+from .shaderTemplates import applyTemplate
+from .omikronProfiling import Profiler, getProfiler, setProfiler, span, count, log, QUIET, SUMMARY, DETAILED
+
+###
+
+def fillPointAttributes(mesh, vertexColors, vertexNormals):
+    #colors and normals are stored once per vertex instead of being expanded to every face corner
+    new_colors = mesh.attributes.new(name = 'DefaultColors', type = 'FLOAT_COLOR', domain = 'POINT')
+    new_colors.data.foreach_set("color", np.asarray(vertexColors, dtype=np.float32).ravel())
+
+    mesh.use_auto_smooth = True #needed for custom normals
+    mesh.normals_split_custom_set_from_vertices(np.asarray(vertexNormals, dtype=np.float32))
+
+def fillMeshPerLoop(mesh, vertices, loopVertices, loopTotals, UVs, vertexColors, vertexNormals, materialIDs, pointAttributes = False):
+    faces = np.split(loopVertices, np.cumsum(loopTotals)[:-1]) if len(loopTotals) > 0 else []
+    mesh.from_pydata(vertices.tolist(), [], faces)
+
+    new_uv = mesh.uv_layers.new(name = 'DefaultUV')
+    for loop in mesh.loops:
+        new_uv.data[loop.index].uv = UVs[loop.index]
+
+    if pointAttributes:
+        fillPointAttributes(mesh, vertexColors, vertexNormals)
+    else:
+        new_colors = mesh.vertex_colors.new(name = 'DefaultColors')
+
+        for loop in mesh.loops:
+            new_colors.data[loop.index].color = vertexColors[loop.vertex_index]
+
+        loop_normals = [None] * len(mesh.loops)
+        for loop in mesh.loops:
+            loop_normals[loop.index] = vertexNormals[loop.vertex_index]
+        log(DETAILED, "vcolors count: {0}", len(vertexColors))
+        log(DETAILED, "normal count: {0}", len(vertexNormals))
+        log(DETAILED, "loops count: {0}", len(mesh.loops))
+        mesh.use_auto_smooth = True #needed for custom normals
+        mesh.normals_split_custom_set(loop_normals)
+        # mesh.calc_normals_split()
+        # for loop in mesh.loops:
+        #     loop.normal = normals[loop.index]
+
+    for faceIndex, face in enumerate(mesh.polygons):
+        face.material_index = int(materialIDs[faceIndex])
+
+def fillMeshBuffers(mesh, vertices, loopVertices, loopTotals, UVs, vertexColors, vertexNormals, materialIDs, pointAttributes = False):
+    #same result as fillMeshPerLoop, but every attribute goes through a single foreach_set
+    loopStarts = (np.cumsum(loopTotals) - loopTotals).astype(np.int32)
+
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", np.asarray(vertices, dtype=np.float32).ravel())
+    mesh.loops.add(len(loopVertices))
+    mesh.loops.foreach_set("vertex_index", np.asarray(loopVertices, dtype=np.int32))
+    mesh.polygons.add(len(loopTotals))
+    mesh.polygons.foreach_set("loop_start", loopStarts)
+    mesh.polygons.foreach_set("loop_total", np.asarray(loopTotals, dtype=np.int32))
+    mesh.polygons.foreach_set("material_index", np.asarray(materialIDs, dtype=np.int32))
+    mesh.update(calc_edges=True)
+
+    new_uv = mesh.uv_layers.new(name = 'DefaultUV')
+    new_uv.data.foreach_set("uv", np.asarray(UVs, dtype=np.float32).ravel())
+
+    if pointAttributes:
+        fillPointAttributes(mesh, vertexColors, vertexNormals)
+        return
+
+    new_colors = mesh.vertex_colors.new(name = 'DefaultColors')
+    new_colors.data.foreach_set("color", np.asarray(vertexColors, dtype=np.float32)[loopVertices].ravel())
+
+    mesh.use_auto_smooth = True #needed for custom normals
+    mesh.normals_split_custom_set(np.asarray(vertexNormals, dtype=np.float32)[loopVertices])
+
+def BuildModel(modelData, objectName, fastMeshBuild = True, pointAttributes = False):
+    meshDescriptors = modelData["meshDescriptors"]
+    materials = modelData["materials"]
+    shaders = modelData["shaders"]
+    meshCenter = modelData["meshCenter"]
+
+    #build the blender mesh
+    with span("mesh build"):
+        mesh = bpy.data.meshes.new(objectName)
+        meshBuffers = [modelData[name] for name in MODEL_ARRAYS]
+        #a span per path, so that reports tell them apart
+        if fastMeshBuild:
+            with span("buffers"):
+                fillMeshBuffers(mesh, *meshBuffers, pointAttributes)
+        else:
+            with span("per loop"):
+                fillMeshPerLoop(mesh, *meshBuffers, pointAttributes)
+
+    with span("validate"):
+        mesh.validate(verbose=getProfiler().verbosity >= DETAILED) #prevents crash on editing levels for now
+
+    object = bpy.data.objects.new(objectName, mesh)
+    object.location = meshCenter
+    scene = bpy.context.scene
+    scene.collection.objects.link(object)
+
+    #reflection probes
+    for i, meshDescriptor in enumerate (meshDescriptors):
+        if not modelData["selectedMeshes"][i]:
+            continue
+        if meshDescriptor["flags"] & environmentMapped !=0:
+            probe = bpy.data.lightprobes.new(meshDescriptor["name"]+"_probe", 'CUBE')
+            probe.clip_end = 200.0
+            probe.influence_distance = meshDescriptor["boxExtentPos"].length + probe.falloff
+            probeObject = bpy.data.objects.new(meshDescriptor["name"]+"_probe", probe)
+            bpy.context.scene.collection.objects.link(probeObject)
+            probeObject.parent = object
+            probeObject.location = meshDescriptor["position"] -object.location
+        if meshDescriptor["flags"] & mirror !=0:
+            probe = bpy.data.lightprobes.new(meshDescriptor["name"]+"_probe", 'PLANAR')
+            probe.clip_end = 200.0
+            probeObject = bpy.data.objects.new(meshDescriptor["name"]+"_probe", probe)
+            bpy.context.scene.collection.objects.link(probeObject)
+            probeObject.parent = object
+            probeObject.location = meshDescriptor["position"] -object.location
+            #change size and orientation to match vertices
+            direction = Vector(modelData["mirrorNormals"].get(i, (0,0,1)))
+            rotation = direction.to_track_quat('Z', 'Y').to_euler() #assuming the mirror is pointing up originally
+            probeObject.rotation_euler = rotation
+            scale = meshDescriptor["boxExtentPos"].length
+            probeObject.scale = [scale, scale, 1]
+
+    #skeleton
+    if modelData["isSkinned"] == True:
+        #adds empty skeleton
+        armature = bpy.data.armatures.new(objectName+"_armature")
+        armatureObject = bpy.data.objects.new(objectName+"_armature", armature)
+        scene.collection.objects.link(armatureObject)
+        
+        armatureObject.show_in_front = True
+        armatureObject.display_type ='WIRE'
+        
+        #move to edit mode
+        bpy.context.window.view_layer.objects.active = armatureObject
+        bpy.ops.object.mode_set(mode='EDIT', toggle=False)
+        edit_bones = armatureObject.data.edit_bones
+        #for each object, create a bone
+        for i, meshDescriptor in enumerate (meshDescriptors):
+            bone = edit_bones.new(meshDescriptor["name"])
+            bone.head = meshDescriptor["position"] -object.location
+            bone.tail = bone.head + Vector([0,0,0.1])
+        #link bones into a hierarchy
+        for i, meshDescriptor in enumerate (meshDescriptors):
+            if modelData["parents_skin"][i] != -1:
+                bone = edit_bones[meshDescriptor["name"]]
+                bone.parent = edit_bones[meshDescriptors[modelData["parents_skin"][i]]["name"]]
+        #orient and connect what we can
+        for bone in edit_bones:
+            if len(bone.children) == 1:
+                bone.tail = bone.children[0].head
+                bone.children[0].use_connect = True
+            elif len(bone.children) == 0 and bone.parent is not None:
+                bone.tail = bone.head + (bone.head - bone.parent.head) /2
+        bpy.ops.object.mode_set(mode = 'OBJECT')
+
+        #for each mesh that is not joint-only, create a vertex group
+        for meshDescriptor, isSelected, (first, vertexCount) in zip(meshDescriptors, modelData["selectedMeshes"], modelData["vertexRanges"]):
+            if meshDescriptor["flags"] & doNotDisplay_jointOnly == 0 and isSelected:
+                vertexGroup = object.vertex_groups.new(name=meshDescriptor["name"])
+                vertexGroup.add(range(first, first + vertexCount), 1.0, 'ADD')
+        
+        #parent mesh to armature
+        armatureObject.location = object.location
+        object.parent = armatureObject
+        object.location = [0,0,0]
+        modifier = object.modifiers.new("Armature", 'ARMATURE')
+        modifier.object = armatureObject
+        
+    # #lights
+    # for lightDescriptor in lights:
+    #     lightObject = bpy.data.objects.new( lightDescriptor["name"], None )
+    #     scene.collection.objects.link(lightObject)
+    #     lightObject.empty_display_size = 2
+    #     lightObject.empty_display_type = 'PLAIN_AXES'
+    #     lightObject.parent = object
+    #     lightObject.location = lightDescriptor["position0"] - object.location
+    #     for i in range(1,6):
+    #         sublightObject = bpy.data.objects.new( lightDescriptor["name"]+"_"+str(i), None )
+    #         scene.collection.objects.link(sublightObject)
+    #         sublightObject.empty_display_size = 1
+    #         sublightObject.empty_display_type = 'PLAIN_AXES'
+    #         sublightObject.parent = lightObject
+    #         sublightObject.location = lightDescriptor["position"+str(i)] - lightObject.location - object.location 
+
+    return mesh, materials, shaders;
+
+def ImportModels(file_object, objectName, fastMeshBuild = True, modelCache = None, pointAttributes = False, meshFilter = None):
+    return BuildModel(LoadModel(file_object, objectName, modelCache, meshFilter), objectName, fastMeshBuild, pointAttributes)
+
+def ImportTextures(mesh, materials, shaders, textureImages, deferredSource = None, shared = None, textureHashes = None, isShadow = False):
+    #textureImages are the decoded pixels of each material, as returned by LoadTextures. used materials that weren't
+    #decoded get a placeholder image decoded later from deferredSource, (texture file path, cache settings), if there is one
+    #with shared (a SharedDatablocks) and the textureHashes of the materials, images and materials already imported are reused
+    #isShadow is for the materials of the shadows file, whose mesh names don't tell (tiles, instances, renamed duplicates)
+    images = dict()
+
+    slots = []
+    keys = list(shaders.keys())
+    values = list(shaders.values())
+    for i in range(len(shaders)):
+        slots.append(keys[values[i]])
+
+    colorAttribute = mesh.vertex_colors.get('DefaultColors') is None #colors filled by fillPointAttributes
+    used = usedMaterials(shaders)
+    for materialIndex, (material, imageData, offset) in enumerate(zip(materials, textureImages, textureOffsets(materials))):
+        if shared is not None and textureHashes[materialIndex] in shared.images:
+            image = shared.images[textureHashes[materialIndex]]
+            count("images reused")
+        elif imageData is not None:
+            image = bpy.data.images.new(material["name"], material["width"], material["height"], alpha = True)
+            image.pixels.foreach_set(imageData)
+            image.file_format = 'PNG'
+            image.pack()
+        elif deferredSource is not None and materialIndex in used:
+            image = deferredTextures.createPlaceholderImage(material, materialIndex, offset, *deferredSource)
+        else:
+            continue
+
+        if shared is not None and textureHashes[materialIndex] not in shared.images:
+            shared.addImage(textureHashes[materialIndex], image)
+        images[materialIndex] = image
+
+    for slot in slots:
+        material = materials[slot[0]]
+        shaderflags = slot[1]
+
+        key = None
+        if shared is not None:
+            key = materialKey(textureHashes[slot[0]], shaderflags, isShadow, colorAttribute)
+            if key in shared.materials:
+                mesh.materials.append(shared.materials[key])
+                count("materials reused")
+                continue
+
+        mat = bpy.data.materials.new(material["name"])
+        mat.use_nodes = True
+        mat.use_backface_culling = True
+        nodes = mat.node_tree.nodes
+        nodes.remove(nodes["Principled BSDF"])
+        textureNode=nodes.new("ShaderNodeTexImage")
+        textureNode.image = images.get(slot[0])
+
+        applyTemplate(mat, textureNode, shaderflags, isShadow, colorAttribute)
+
+        if key is not None:
+            shared.addMaterial(key, mat)
+        mesh.materials.append(mat)
+
+def isShadowFile(modelFilePath):
+    return modelObjectName(modelFilePath) == "shadows"
+
+###
+
+class OmikronImportOptions:
+    #properties and import steps shared by the import operators, which only differ in how they find the files to import
+    #(modelFilePaths). a mixin rather than a base operator, as blender only registers the properties of bases that
+    #aren't bpy_struct subclasses
+
+    fast_mesh_build: BoolProperty(
+        name="Fast mesh build",
+        description="Fill the mesh with bulk foreach_set calls instead of setting each loop and face one at a time",
+        default=True,
+    )
+
+    point_attributes: BoolProperty(
+        name="Per vertex colors and normals",
+        description="Store vertex colors as a point attribute and set custom normals per vertex, instead of once per face corner. Uses less memory on large backgrounds",
+        default=False,
+    )
+
+    texture_loading: EnumProperty(
+        name="Textures",
+        description="Which textures are decoded while importing",
+        items=(
+            (TEXTURES_ALL, "All", "Decode every texture of the 3DT file"),
+            (TEXTURES_USED, "Used", "Only decode the textures some face uses"),
+            (TEXTURES_DEFERRED, "On display", "Import blank placeholders, decoded when first shown in a material or rendered view, or with Load deferred Omikron textures"),
+        ),
+        default=TEXTURES_ALL,
+    )
+
+    reuse_materials: BoolProperty(
+        name="Reuse materials",
+        description="Share images and materials with identical textures and shading, including those of earlier imports, instead of creating copies",
+        default=True,
+    )
+
+    mesh_names: StringProperty(
+        name="Mesh names",
+        description="Only import the meshes whose name matches one of these comma separated patterns, where * matches anything. Leave empty to import every mesh",
+        default="",
+    )
+
+    exclude_flags: EnumProperty(
+        name="Skip meshes",
+        description="Meshes with any of these flags are left out",
+        items=(
+            ('skybox', "Skybox", ""),
+            ('environmentMapped', "Environment mapped", ""),
+            ('mirror', "Mirrors", ""),
+            ('WaterSurface', "Water surface", ""),
+            ('underwater', "Underwater", ""),
+            ('alphablending', "Alpha blended", ""),
+            ('FPSarm', "First person arms", ""),
+        ),
+        options={'ENUM_FLAG'},
+        default=set(),
+    )
+
+    use_mesh_box: BoolProperty(
+        name="Mesh box",
+        description="Only import the meshes whose bounds meet the box from Mesh box min to Mesh box max, in world space",
+        default=False,
+    )
+
+    mesh_box_min: FloatVectorProperty(
+        name="Mesh box min",
+        subtype='XYZ',
+    )
+
+    mesh_box_max: FloatVectorProperty(
+        name="Mesh box max",
+        subtype='XYZ',
+    )
+
+    proxies: EnumProperty(
+        name="Proxies",
+        description="Only read the mesh descriptors and stand in for each mesh with its bounds, to be replaced later with Replace Omikron proxies",
+        items=(
+            ('NONE', "None", "Import the geometry"),
+            ('BOXES', "Boxes", "An object per mesh, all sharing one cube mesh scaled to the bounds"),
+            ('POINTS', "Points", "An object per file with a vertex per mesh, its bounds stored in the boxMin and boxMax attributes"),
+        ),
+        default='NONE',
+    )
+
+    tile_size: FloatProperty(
+        name="Tile size",
+        description="Split each file into one object per square of this size, built one after the other so that memory use follows the tile size. 0 imports each file as a single object",
+        default=0.0,
+        min=0.0,
+        subtype='DISTANCE',
+    )
+
+    instance_repeats: BoolProperty(
+        name="Instance repeated meshes",
+        description="Build meshes whose geometry, textures and shading repeat only once, and place linked duplicates of them. Earlier imports are reused too when Reuse materials is on. Not used together with Tile size",
+        default=False,
+    )
+
+    use_cache: BoolProperty(
+        name="Use cache",
+        description="Keep parsed models and decoded textures in an on-disk cache, and reuse them when the same files are imported again",
+        default=True,
+    )
+
+    clear_cache: BoolProperty(
+        name="Clear cache",
+        description="Empty the cache before importing",
+        default=False,
+    )
+
+    cache_size: IntProperty(
+        name="Cache size (MB)",
+        description="Least recently used entries are removed once the cache grows past this size, half of it going to models and half to textures",
+        default=512,
+        min=16,
+    )
+
+    cache_directory: StringProperty(
+        name="Cache directory",
+        description="Where the cache is kept. Leave empty to use the system's temporary directory",
+        subtype='DIR_PATH',
+        default="",
+    )
+    
+    worker_count: IntProperty(
+        name="Worker processes",
+        description="Number of processes parsing files and decoding textures in parallel when importing several files. 0 uses one per CPU core, up to one per file",
+        default=0,
+        min=0,
+    )
+
+    verbosity: EnumProperty(
+        name="Console output",
+        description="What is printed to the system console while importing",
+        items=(
+            ('QUIET', "Quiet", "Print nothing"),
+            ('SUMMARY', "Summary", "Print each imported file and a table of the time spent in each stage"),
+            ('DETAILED', "Detailed", "Also print materials, lights, duplicate faces and mesh validation as they are found"),
+        ),
+        default='QUIET',
+    )
+
+    use_profiler: BoolProperty(
+        name="Profile",
+        description="Run the import under cProfile, including the worker processes, and print the slowest functions",
+        default=False,
+    )
+
+    report_path: StringProperty(
+        name="Report file",
+        description="Write the stage timings and counters to this JSON file. Leave empty to not write a report",
+        subtype='FILE_PATH',
+        default="",
+    )
+
+    def meshFilter(self):
+        #None when every mesh is imported, so that unfiltered files go through the usual path and cache entries
+        names = tuple(name.strip() for name in self.mesh_names.split(",") if name.strip() != "")
+        excludedFlags = 0
+        for flag in self.exclude_flags:
+            excludedFlags |= MESH_FLAGS[flag]
+        box = (tuple(self.mesh_box_min), tuple(self.mesh_box_max)) if self.use_mesh_box else None
+        if len(names) == 0 and excludedFlags == 0 and box is None:
+            return None
+        return MeshFilter(names, excludedFlags, box, None)
+
+    def execute(self, context):
+        verbosity = {'QUIET': QUIET, 'SUMMARY': SUMMARY, 'DETAILED': DETAILED}[self.verbosity]
+        profiler = Profiler(verbosity, self.use_profiler)
+        previous = setProfiler(profiler)
+        try:
+            with profiler.profiling(), span("import"):
+                self.importFiles(context)
+        finally:
+            setProfiler(previous)
+
+        if verbosity >= SUMMARY or self.use_profiler:
+            print(profiler.table())
+            if self.use_profiler:
+                print(profiler.profileText())
+        if self.report_path != "":
+            profiler.writeReport(bpy.path.abspath(self.report_path))
+        return {'FINISHED'}
+
+    def importFiles(self, context):
+        log(SUMMARY, "importer start")
+
+        cacheDirectory = bpy.path.abspath(self.cache_directory) if self.cache_directory != "" else defaultCacheDirectory()
+        cacheSettings = (cacheDirectory, self.cache_size * 1024 * 1024)
+        if self.clear_cache:
+            for cache in openCaches(*cacheSettings):
+                cache.clear()
+        if not self.use_cache:
+            cacheSettings = None
+
+        #parsing and texture decoding happen in worker processes, only datablock creation is done here
+        modelFilePaths = self.modelFilePaths()
+        shared = SharedDatablocks() if self.reuse_materials else None
+        windowManager = context.window_manager
+        windowManager.progress_begin(0, len(modelFilePaths))
+        if self.proxies != 'NONE':
+            from . import proxyImport
+            for fileIndex, modelFilePath in enumerate(modelFilePaths):
+                proxyImport.createProxies(modelFilePath, self.proxies, self.meshFilter(), cacheSettings)
+                windowManager.progress_update(fileIndex + 1)
+            count("files", len(modelFilePaths))
+            windowManager.progress_end()
+            return
+        if self.tile_size > 0 or self.instance_repeats:
+            for fileIndex, modelFilePath in enumerate(modelFilePaths):
+                if self.tile_size > 0:
+                    self.importTiles(modelFilePath, cacheSettings, shared)
+                else:
+                    self.importInstanced(modelFilePath, cacheSettings, shared)
+                windowManager.progress_update(fileIndex + 1)
+                log(SUMMARY, "imported {0}/{1}: {2}", fileIndex + 1, len(modelFilePaths), modelObjectName(modelFilePath))
+            windowManager.progress_end()
+            return
+        for fileIndex, (modelFilePath, modelData, textureImages) in enumerate(LoadFiles(modelFilePaths, cacheSettings, self.worker_count, self.texture_loading, self.meshFilter())):
+            log(DETAILED, "modelFilePath: {0}", modelFilePath)
+            if not any(modelData["selectedMeshes"]):
+                self.reportFilteredOut(modelFilePath)
+                windowManager.progress_update(fileIndex + 1)
+                continue
+            with span("build model"):
+                mesh, materials, shaders = BuildModel(modelData, modelObjectName(modelFilePath), self.fast_mesh_build, self.point_attributes)
+            if textureImages is not None:
+                log(DETAILED, "textureFilePath: {0}", textureFilePath(modelFilePath))
+                with span("build materials"):
+                    deferredSource = (textureFilePath(modelFilePath), cacheSettings) if self.texture_loading == TEXTURES_DEFERRED else None
+                    textureHashes = HashTextures(textureFilePath(modelFilePath), materials) if shared is not None else None
+                    ImportTextures(mesh, materials, shaders, textureImages, deferredSource, shared, textureHashes, isShadowFile(modelFilePath))
+            count("files")
+            windowManager.progress_update(fileIndex + 1)
+            log(SUMMARY, "imported {0}/{1}: {2}", fileIndex + 1, len(modelFilePaths), modelObjectName(modelFilePath))
+        windowManager.progress_end()
+
+    def importTiles(self, modelFilePath, cacheSettings, shared):
+        #one object per tile, each built before the next one is parsed. textures are decoded for the first tile
+        #that uses them, later tiles reuse their images and materials
+        if shared is None:
+            shared = SharedDatablocks(scanBlendFile=False)
+        hasTextures = os.path.exists(textureFilePath(modelFilePath))
+        textureHashes = None
+        imported = False
+        for objectName, modelData in LoadTiles(modelFilePath, cacheSettings, self.tile_size, self.meshFilter()):
+            with span("build model"):
+                mesh, materials, shaders = BuildModel(modelData, objectName, self.fast_mesh_build, self.point_attributes)
+            if hasTextures:
+                textureHashes = self.importPartTextures(modelFilePath, mesh, materials, shaders, modelData, cacheSettings, shared, textureHashes)
+            imported = True
+        if not imported and self.meshFilter() is not None:
+            self.reportFilteredOut(modelFilePath)
+            return
+        count("files")
+
+    def importInstanced(self, modelFilePath, cacheSettings, shared):
+        #meshes whose geometry repeats, in this file or earlier ones, are built once and placed as linked duplicates
+        if shared is None:
+            shared = SharedDatablocks(scanBlendFile=False)
+        hasTextures = os.path.exists(textureFilePath(modelFilePath))
+        textureHashes = None
+        scene = bpy.context.scene
+        imported = False
+        for objectName, modelData, geometryHash, placements in LoadInstancedModel(modelFilePath, cacheSettings, self.meshFilter(), set(shared.meshes)):
+            imported = True
+            if modelData is not None:
+                with span("build model"):
+                    mesh, materials, shaders = BuildModel(modelData, objectName, self.fast_mesh_build, self.point_attributes)
+                if hasTextures:
+                    textureHashes = self.importPartTextures(modelFilePath, mesh, materials, shaders, modelData, cacheSettings, shared, textureHashes)
+                if geometryHash is not None:
+                    shared.addMesh(geometryHash, mesh)
+                placements = placements[1:] #BuildModel placed the mesh it was parsed from
+            else:
+                mesh = shared.meshes[geometryHash]
+            with span("instances"):
+                for name, position in placements:
+                    object = bpy.data.objects.new(name, mesh)
+                    object.location = position
+                    scene.collection.objects.link(object)
+            count("instances", len(placements))
+        if not imported and self.meshFilter() is not None:
+            self.reportFilteredOut(modelFilePath)
+            return
+        count("files")
+
+    def reportFilteredOut(self, modelFilePath):
+        #the filter rejected every mesh of the file, which is left out rather than imported as an empty object
+        self.report({'WARNING'}, "no mesh of {0} passes the filter, it was not imported".format(modelObjectName(modelFilePath)))
+        count("files filtered out")
+
+    def importPartTextures(self, modelFilePath, mesh, materials, shaders, modelData, cacheSettings, shared, textureHashes):
+        #materials of a part of a file, a tile or an instanced mesh. textures are decoded for the first part that uses them,
+        #the following ones reuse their images. returns textureHashes, computed on the first call when it's None
+        with span("build materials"):
+            if textureHashes is None:
+                textureHashes = HashTextures(textureFilePath(modelFilePath), materials)
+            textureImages = [None] * len(materials)
+            indices = [index for index in texturesToDecode(modelData, self.texture_loading) if textureHashes[index] not in shared.images]
+            if len(indices) > 0:
+                for index, imageData in LoadTextureBatch(textureFilePath(modelFilePath), materials, indices, cacheSettings):
+                    textureImages[index] = imageData
+            deferredSource = (textureFilePath(modelFilePath), cacheSettings) if self.texture_loading == TEXTURES_DEFERRED else None
+            ImportTextures(mesh, materials, shaders, textureImages, deferredSource, shared, textureHashes, isShadowFile(modelFilePath))
+        return textureHashes
+
+class ImportOmikron(bpy.types.Operator, ImportHelper, OmikronImportOptions):
+    bl_idname       = "import_omikron.chev";
+    bl_label        = "import 3DO";
+    bl_options      = {'PRESET'};
+    
+    filename_ext    = ".3do";
+
+    filter_glob: StringProperty(
+        default="*.3do",
+        options={'HIDDEN'},
+        maxlen=255,  # Max internal buffer length, longer would be clamped.
+    )
+
+    files: CollectionProperty(
+        name="3DO files",
+        type=OperatorFileListElement,
+        )
+
+    directory: StringProperty(subtype='DIR_PATH')
+
+    import_directory: BoolProperty(
+        name="Whole directory",
+        description="Import every 3DO file in the selected directory",
+        default=False,
+    )
+
+    def modelFilePaths(self):
+        if self.import_directory:
+            fileNames = sorted(fileName for fileName in os.listdir(self.directory) if fileName.lower().endswith(".3do"))
+        else:
+            fileNames = [file.name for file in self.files if file.name != ""]
+        if len(fileNames) == 0:
+            return [self.filepath]
+        return [os.path.join(self.directory, fileName) for fileName in fileNames]
+
+def menu_func(self, context):
+    self.layout.operator(ImportOmikron.bl_idname, text="Omikron model (*.3DO)");
+
+def register():
+    from bpy.utils import register_class
+    register_class(ImportOmikron)
+    bpy.types.TOPBAR_MT_file_import.append(menu_func)
+    deferredTextures.register()
+    from . import regionImport, proxyImport #they use this module, so they can only be imported once it is
+    regionImport.register()
+    proxyImport.register()
+    
+def unregister():
+    from bpy.utils import unregister_class
+    from . import regionImport, proxyImport
+    proxyImport.unregister()
+    regionImport.unregister()
+    deferredTextures.unregister()
+    unregister_class(ImportOmikron)
+    bpy.types.TOPBAR_MT_file_import.remove(menu_func);
\ No newline at end of file
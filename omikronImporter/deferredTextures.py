@@ -0,0 +1,178 @@
+# placeholder images for textures that are only decoded once they are displayed or rendered
+import time
+import bpy
+from bpy.props import BoolProperty
+from bpy.app.handlers import persistent
+
+from .omikronWorkers import *
+from .omikronProfiling import log, SUMMARY
+
+DEFERRED_PROPERTY = "omikron_deferred_texture" #where a placeholder image keeps what it needs to decode its texture
+CHECK_INTERVAL = 0.2 #seconds between a display change and the check for placeholders, and between batches of decoding
+FILL_BUDGET = 0.1 #seconds of decoding per batch, so the interface stays responsive
+
+watching = False #placeholders may be left, set when some are created or a file with some is loaded
+shadingOwner = object() #owner of the msgbus subscription to shading changes
+
+def createPlaceholderImage(material, materialIndex, offset, textureFilePath, cacheSettings = None):
+    #blank image of the texture's size, decoded later by fillDeferredImage
+    image = bpy.data.images.new(material["name"], material["width"], material["height"], alpha = True)
+    image.generated_color = (0.5, 0.5, 0.5, 1.0)
+    image[DEFERRED_PROPERTY] = {
+        "path": textureFilePath,
+        "index": materialIndex,
+        "offset": offset,
+        "dataSize": material["dataSize"],
+        "BPP": material["BPP"],
+        "width": material["width"],
+        "height": material["height"],
+        "cacheDirectory": cacheSettings[0] if cacheSettings is not None else "",
+        "cacheSize": float(cacheSettings[1]) if cacheSettings is not None else 0.0, #floats, as integer properties are 32 bits
+    }
+    startWatching()
+    return image
+
+def fillDeferredImage(image):
+    source = image.get(DEFERRED_PROPERTY)
+    if source is None:
+        return False
+    del image[DEFERRED_PROPERTY] #whatever happens, don't try again on every check
+    material = Material(name=image.name, dataSize=source["dataSize"], BPP=source["BPP"], width=source["width"], height=source["height"])
+    textureCache = None
+    if source["cacheDirectory"] != "":
+        textureCache = openCaches(source["cacheDirectory"], int(source["cacheSize"]))[1]
+    try:
+        with MappedFile(source["path"]) as textures_in:
+            imageData = LoadTexture(textures_in, material, source["index"], source["offset"], textureCache)
+    except (OSError, ValueError, IndexError) as error:
+        print("could not load texture {0} from {1} ({2})".format(image.name, source["path"], error))
+        return False
+    image.pixels.foreach_set(imageData)
+    image.file_format = 'PNG'
+    image.pack()
+    log(SUMMARY, "loaded deferred texture {0}", image.name)
+    return True
+
+def pendingImages():
+    return [image for image in bpy.data.images if DEFERRED_PROPERTY in image]
+
+def objectImages(objects, pendingNames = None):
+    #placeholder images used by the materials of objects, those named in pendingNames when it's given
+    images = dict()
+    for object in objects:
+        for slot in object.material_slots:
+            if slot.material is None or slot.material.node_tree is None:
+                continue
+            for node in slot.material.node_tree.nodes:
+                if node.type == 'TEX_IMAGE' and node.image is not None and (
+                        node.image.name in pendingNames if pendingNames is not None else DEFERRED_PROPERTY in node.image):
+                    images[node.image.name] = node.image
+    return list(images.values())
+
+def materialViewLayers():
+    #view layers of the windows with a 3D view that shows materials
+    viewLayers = dict()
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D' and area.spaces.active.shading.type in {'MATERIAL', 'RENDERED'}:
+                viewLayers[window.view_layer.as_pointer()] = window.view_layer
+                break
+    return list(viewLayers.values())
+
+def displayedImages(viewLayers, pendingNames):
+    #placeholders used by objects visible in these view layers
+    objects = dict()
+    for viewLayer in viewLayers:
+        for object in viewLayer.objects:
+            if object.visible_get(view_layer=viewLayer):
+                objects[object.name] = object
+    return objectImages(objects.values(), pendingNames)
+
+def checkDeferredTextures():
+    #timer, decodes displayed placeholders a few at a time. it stops once none are displayed, and is scheduled
+    #again by watchDisplayChanges and shadingChanged, so placeholders that are never shown don't keep it running
+    global watching
+    pendingNames = {image.name for image in pendingImages()}
+    if len(pendingNames) == 0:
+        watching = False
+        return None
+    viewLayers = materialViewLayers()
+    if len(viewLayers) == 0:
+        return None
+    start = time.perf_counter()
+    for image in displayedImages(viewLayers, pendingNames):
+        if time.perf_counter() - start > FILL_BUDGET:
+            return CHECK_INTERVAL #the rest in the next batch
+        fillDeferredImage(image)
+    return None
+
+def scheduleCheck():
+    if not bpy.app.timers.is_registered(checkDeferredTextures):
+        bpy.app.timers.register(checkDeferredTextures, first_interval=CHECK_INTERVAL, persistent=True)
+
+def startWatching():
+    global watching
+    watching = True
+    scheduleCheck()
+
+@persistent
+def watchDisplayChanges(scene, *arguments):
+    #objects shown, added or given other materials
+    if watching:
+        scheduleCheck()
+
+def shadingChanged(*arguments):
+    if watching:
+        scheduleCheck()
+
+def subscribeShading():
+    #switching a 3D view to material preview or rendered shading doesn't update the depsgraph
+    bpy.msgbus.subscribe_rna(key=(bpy.types.View3DShading, "type"), owner=shadingOwner, args=(), notify=shadingChanged)
+
+@persistent
+def fillRenderedTextures(scene, *arguments):
+    #renders can't wait for the timer, everything visible is decoded first
+    for image in objectImages(object for object in scene.objects if object.visible_get()):
+        fillDeferredImage(image)
+
+@persistent
+def watchLoadedFile(*arguments):
+    subscribeShading() #subscriptions don't survive loading a file
+    if len(pendingImages()) > 0:
+        startWatching()
+
+class LoadDeferredTextures(bpy.types.Operator):
+    bl_idname = "import_omikron.load_deferred_textures"
+    bl_label = "Load deferred Omikron textures"
+    bl_description = "Decode the Omikron textures that were imported as placeholders"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    selected_only: BoolProperty(
+        name="Selected only",
+        description="Only load the textures used by the selected objects",
+        default=False,
+    )
+
+    def execute(self, context):
+        images = objectImages(context.selected_objects) if self.selected_only else pendingImages()
+        loaded = sum(1 for image in images if fillDeferredImage(image))
+        self.report({'INFO'}, "loaded {0} textures".format(loaded))
+        return {'FINISHED'}
+
+def register():
+    from bpy.utils import register_class
+    register_class(LoadDeferredTextures)
+    bpy.app.handlers.render_pre.append(fillRenderedTextures)
+    bpy.app.handlers.load_post.append(watchLoadedFile)
+    bpy.app.handlers.depsgraph_update_post.append(watchDisplayChanges)
+    subscribeShading()
+
+def unregister():
+    if bpy.app.timers.is_registered(checkDeferredTextures):
+        bpy.app.timers.unregister(checkDeferredTextures)
+    bpy.msgbus.clear_by_owner(shadingOwner)
+    bpy.app.handlers.depsgraph_update_post.remove(watchDisplayChanges)
+    bpy.app.handlers.load_post.remove(watchLoadedFile)
+    bpy.app.handlers.render_pre.remove(fillRenderedTextures)
+    from bpy.utils import unregister_class
+    unregister_class(LoadDeferredTextures)
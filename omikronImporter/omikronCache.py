@@ -0,0 +1,203 @@
+# on-disk cache, persists parsed models and decoded textures between imports and sessions
+import os # for path stuff
+import hashlib
+import json
+import tempfile
+import numpy as np
+
+from .omikronFormat import *
+from .omikronProfiling import span, count
+
+CACHE_VERSION = 5 #bump when the cached data layout changes
+
+def defaultCacheDirectory():
+    return os.path.join(tempfile.gettempdir(), "omikron_importer_cache")
+
+def sourceFileKey(path):
+    #identifies a given version of a source file
+    stat = os.stat(path)
+    return "{0}|{1}|{2}|{3}".format(os.path.abspath(path), stat.st_mtime_ns, stat.st_size, CACHE_VERSION)
+
+def cacheKey(*parts):
+    return hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+def removeFile(path):
+    #another import running in parallel may have removed it already, or on windows still have it open
+    try:
+        os.remove(path)
+    except (FileNotFoundError, PermissionError):
+        pass
+
+class DiskCache:
+    #directory of .npy (single array) or .npz (dict of arrays) files with a size limit,
+    #least recently used entries are evicted first. the directory is only scanned when the size it had at the last
+    #scan, plus what was stored since, goes past maxSize
+    def __init__(self, directory, maxSize, extension = ".npy"):
+        self.directory = directory
+        self.maxSize = maxSize
+        self.extension = extension
+        self.totalSize = None #estimated size of the entries, None until the first scan
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def load(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as cache_in:
+                loaded = np.load(cache_in, allow_pickle=False)
+                if self.extension == ".npz":
+                    loaded = dict(loaded)
+            os.utime(path) #mark as recently used
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            removeFile(path)
+            return None
+        return loaded
+
+    def store(self, key, data):
+        path = self.path(key)
+        os.makedirs(self.directory, exist_ok=True) #the cache may have been deleted since it was opened
+        temporaryPath = "{0}.{1}.tmp".format(path, os.getpid())
+        with open(temporaryPath, "wb") as cache_out:
+            if self.extension == ".npz":
+                np.savez(cache_out, **data)
+            else:
+                np.save(cache_out, data, allow_pickle=False)
+        size = os.path.getsize(temporaryPath)
+        try:
+            os.replace(temporaryPath, path)
+        except PermissionError:
+            #on windows, another process reading the entry keeps it from being replaced
+            removeFile(temporaryPath)
+            return
+        if self.totalSize is not None:
+            self.totalSize += size
+        if self.totalSize is None or self.totalSize > self.maxSize:
+            self.evict()
+
+    def entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.extension):
+                try:
+                    entries.append((entry.path, entry.stat()))
+                except FileNotFoundError:
+                    pass
+        return entries
+
+    def evict(self):
+        entries = sorted(self.entries(), key=lambda entry: entry[1].st_mtime)
+        totalSize = sum(stat.st_size for path, stat in entries)
+        for path, stat in entries:
+            if totalSize <= self.maxSize:
+                break
+            totalSize -= stat.st_size
+            removeFile(path)
+        self.totalSize = totalSize
+
+    def clear(self):
+        for path, stat in self.entries():
+            removeFile(path)
+        self.totalSize = 0
+
+openedCaches = dict() #(cacheDirectory, cacheSize): caches, kept so that their size estimates last across loads
+
+def openCaches(cacheDirectory, cacheSize):
+    #model and texture caches sharing one root directory, cacheSize in bytes is split evenly between them
+    caches = openedCaches.get((cacheDirectory, cacheSize))
+    if caches is None:
+        modelCache = DiskCache(os.path.join(cacheDirectory, "models"), cacheSize // 2, ".npz")
+        textureCache = DiskCache(os.path.join(cacheDirectory, "textures"), cacheSize - cacheSize // 2)
+        caches = openedCaches[(cacheDirectory, cacheSize)] = (modelCache, textureCache)
+    return caches
+
+VECTOR_FIELDS = ("position", "boxExtentNeg", "boxExtentPos", "bonePosition")
+
+def storeCachedModel(modelCache, key, modelData):
+    #arrays are stored as is, everything else goes in a json string
+    metadata = dict()
+    metadata["meshDescriptors"] = [dict(meshDescriptor, **{field: list(meshDescriptor[field]) for field in VECTOR_FIELDS}) for meshDescriptor in modelData["meshDescriptors"]]
+    metadata["materials"] = [dict(material) for material in modelData["materials"]]
+    metadata["shaders"] = [[material, shaderFlags, slot] for (material, shaderFlags), slot in modelData["shaders"].items()]
+    metadata["mirrorNormals"] = [[i] + list(normal) for i, normal in modelData["mirrorNormals"].items()]
+    for field in ("isSkinned", "parents_hierarchy", "parents_skin", "selectedMeshes", "vertexRanges", "meshCenter"):
+        metadata[field] = modelData[field]
+
+    arrays = {name: modelData[name] for name in MODEL_ARRAYS}
+    arrays["metadata"] = np.frombuffer(json.dumps(metadata).encode("utf-8"), dtype=np.uint8)
+    modelCache.store(key, arrays)
+
+def loadCachedModel(modelCache, key):
+    arrays = modelCache.load(key)
+    if arrays is None:
+        return None
+    modelData = json.loads(arrays.pop("metadata").tobytes().decode("utf-8"))
+    modelData["meshDescriptors"] = [MeshDescriptor(**dict(meshDescriptor, **{field: Vector3(meshDescriptor[field]) for field in VECTOR_FIELDS}))
+        for meshDescriptor in modelData["meshDescriptors"]]
+    modelData["materials"] = [Material(**material) for material in modelData["materials"]]
+    modelData["shaders"] = {(material, shaderFlags): slot for material, shaderFlags, slot in modelData["shaders"]}
+    modelData["mirrorNormals"] = {mirrorNormal[0]: Vector3(mirrorNormal[1:]) for mirrorNormal in modelData["mirrorNormals"]}
+    modelData["meshCenter"] = tuple(modelData["meshCenter"])
+    modelData.update(arrays)
+    return modelData
+
+def loadCachedTexture(textureCache, sourceKey, materialIndex, material):
+    if textureCache is None:
+        return None
+    rgba = textureCache.load(cacheKey(sourceKey, materialIndex))
+    if rgba is None or rgba.size != material["width"] * material["height"] * 4:
+        return None
+    return (rgba / 255).astype(np.float32).ravel()
+
+def storeCachedTexture(textureCache, sourceKey, materialIndex, imageData):
+    if textureCache is not None:
+        #palette values are all n/255, so 8 bits per channel are lossless
+        textureCache.store(cacheKey(sourceKey, materialIndex), np.rint(imageData * 255).astype(np.uint8))
+
+
+def LoadModel(file_object, objectName, modelCache = None, meshFilter = None):
+    #ParseModel, going through the cache when there is one
+    if modelCache is None:
+        return ParseModel(file_object, objectName, meshFilter)
+    key = cacheKey(sourceFileKey(file_object.name), objectName, repr(meshFilter))
+    with span("cache load"):
+        modelData = loadCachedModel(modelCache, key)
+    if modelData is None:
+        count("model cache misses")
+        modelData = ParseModel(file_object, objectName, meshFilter)
+        with span("cache store"):
+            storeCachedModel(modelCache, key, modelData)
+    else:
+        count("model cache hits")
+    return modelData
+
+def LoadTexture(file_object, material, materialIndex, offset, textureCache = None, sourceKey = None):
+    #flat RGBA pixel buffer of one material, going through the cache when there is one
+    imageData = None
+    if textureCache is not None:
+        if sourceKey is None:
+            sourceKey = sourceFileKey(file_object.name)
+        with span("cache load"):
+            imageData = loadCachedTexture(textureCache, sourceKey, materialIndex, material)
+        count("texture cache hits" if imageData is not None else "texture cache misses")
+    if imageData is None:
+        file_object.seek(offset)
+        imageData = ReadTexture(file_object, material)
+        storeCachedTexture(textureCache, sourceKey, materialIndex, imageData)
+    return imageData
+
+def LoadTextures(file_object, materials, textureCache = None, onlyMaterials = None):
+    #flat RGBA pixel buffer of every material, or only of those in onlyMaterials, the others being None
+    sourceKey = sourceFileKey(file_object.name) if textureCache is not None else None
+    textureImages = []
+    for materialIndex, (material, offset) in enumerate(zip(materials, textureOffsets(materials))):
+        if onlyMaterials is not None and materialIndex not in onlyMaterials:
+            textureImages.append(None)
+            continue
+        textureImages.append(LoadTexture(file_object, material, materialIndex, offset, textureCache, sourceKey))
+    return textureImages
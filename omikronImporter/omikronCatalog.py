@@ -0,0 +1,138 @@
+# sqlite catalog of the models of an install, made from their headers and mesh descriptors only,
+# to find which 3DO files cover a part of the world without parsing them
+import os # for path stuff
+import sqlite3
+import struct
+
+from .omikronFormat import *
+from .omikronCache import defaultCacheDirectory
+from .omikronProfiling import span, count, log, SUMMARY
+
+CATALOG_VERSION = 1 #bump when the tables change, the catalog is then rebuilt
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, name TEXT, mtime INTEGER, size INTEGER, hasTextures INTEGER,
+    materialCount INTEGER, meshCount INTEGER, vertexCount INTEGER, triangleCount INTEGER, rectangleCount INTEGER,
+    minX REAL, minY REAL, minZ REAL, maxX REAL, maxY REAL, maxZ REAL);
+CREATE TABLE IF NOT EXISTS meshes (
+    path TEXT, meshIndex INTEGER, name TEXT, flags INTEGER, meshID INTEGER, parentID INTEGER,
+    vertexCount INTEGER, triangleCount INTEGER, rectangleCount INTEGER,
+    positionX REAL, positionY REAL, positionZ REAL,
+    minX REAL, minY REAL, minZ REAL, maxX REAL, maxY REAL, maxZ REAL,
+    PRIMARY KEY (path, meshIndex));
+CREATE TABLE IF NOT EXISTS materials (
+    path TEXT, materialIndex INTEGER, name TEXT, BPP INTEGER, width INTEGER, height INTEGER,
+    PRIMARY KEY (path, materialIndex));
+CREATE INDEX IF NOT EXISTS filesBounds ON files (minX, maxX);
+CREATE INDEX IF NOT EXISTS meshesBounds ON meshes (minX, maxX);
+"""
+
+def defaultCatalogPath():
+    return os.path.join(defaultCacheDirectory(), "catalog.sqlite")
+
+def modelFiles(directory):
+    #every 3DO below directory
+    paths = []
+    for root, directories, fileNames in os.walk(directory):
+        paths.extend(os.path.join(root, fileName) for fileName in fileNames if fileName.lower().endswith(".3do"))
+    return sorted(paths)
+
+def boxUnion(boxes):
+    boxes = list(boxes)
+    return Vector3(map(min, *(low for low, high in boxes))), Vector3(map(max, *(high for low, high in boxes)))
+
+class Catalog:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != CATALOG_VERSION:
+            with self.connection:
+                for table in ("files", "meshes", "materials"):
+                    self.connection.execute("DROP TABLE IF EXISTS " + table)
+                self.connection.execute("PRAGMA user_version = {0}".format(CATALOG_VERSION))
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def remove(self, path):
+        for table in ("files", "meshes", "materials"):
+            self.connection.execute("DELETE FROM {0} WHERE path = ?".format(table), (path,))
+
+    def add(self, path, stat):
+        header, materials, meshDescriptors = scanModelFile(path)
+        bounds = [meshBounds(meshDescriptor) for meshDescriptor in meshDescriptors]
+        displayed = [box for box, meshDescriptor in zip(bounds, meshDescriptors) if isDisplayed(meshDescriptor)]
+        low, high = boxUnion(displayed or bounds) if len(bounds) > 0 else (Vector3((0, 0, 0)), Vector3((0, 0, 0)))
+
+        self.remove(path)
+        self.connection.execute("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+            path, os.path.splitext(os.path.basename(path))[0], stat.st_mtime_ns, stat.st_size, os.path.exists(path[:-3] + "3dt"),
+            len(materials), len(meshDescriptors),
+            sum(meshDescriptor.vertexCount for meshDescriptor in meshDescriptors),
+            sum(meshDescriptor.triangleCount for meshDescriptor in meshDescriptors),
+            sum(meshDescriptor.rectangleCount for meshDescriptor in meshDescriptors),
+            *low, *high))
+        self.connection.executemany("INSERT INTO meshes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+            (path, i, meshDescriptor.name, meshDescriptor.flags, meshDescriptor.meshID, meshDescriptor.parentID,
+                meshDescriptor.vertexCount, meshDescriptor.triangleCount, meshDescriptor.rectangleCount,
+                *meshDescriptor.position, *box[0], *box[1])
+            for i, (meshDescriptor, box) in enumerate(zip(meshDescriptors, bounds))))
+        self.connection.executemany("INSERT INTO materials VALUES (?, ?, ?, ?, ?, ?)", (
+            (path, i, material.name, material.BPP, material.width, material.height) for i, material in enumerate(materials)))
+
+    def update(self, directory):
+        #scans the 3DO files below directory that are new or changed since the last update, and forgets removed ones
+        #returns the number of files scanned
+        directory = os.path.abspath(directory)
+        known = {path: (mtime, size) for path, mtime, size in self.connection.execute("SELECT path, mtime, size FROM files")}
+        scanned = 0
+        with span("catalog update"), self.connection:
+            paths = modelFiles(directory)
+            for path in paths:
+                stat = os.stat(path)
+                if known.get(path) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                try:
+                    self.add(path, stat)
+                except (OSError, ValueError, struct.error) as error:
+                    log(SUMMARY, "could not scan {0} ({1})", path, error)
+                    self.remove(path)
+                    continue
+                scanned += 1
+            present = set(paths)
+            for path in known:
+                if path.startswith(os.path.join(directory, "")) and path not in present:
+                    self.remove(path)
+        count("files scanned", scanned)
+        log(SUMMARY, "catalog: {0} of {1} files scanned", scanned, len(paths))
+        return scanned
+
+    def filesIntersecting(self, low, high, directory = None):
+        #paths of the files whose bounds intersect the box from low to high, optionally only those below directory
+        rows = self.connection.execute("""SELECT path FROM files
+            WHERE minX <= ? AND maxX >= ? AND minY <= ? AND maxY >= ? AND minZ <= ? AND maxZ >= ? ORDER BY path""",
+            (high[0], low[0], high[1], low[1], high[2], low[2]))
+        paths = [path for path, in rows]
+        if directory is not None:
+            prefix = os.path.join(os.path.abspath(directory), "")
+            paths = [path for path in paths if path.startswith(prefix)]
+        return paths
+
+    def filesAround(self, point, distance = 0.0, directory = None):
+        return self.filesIntersecting([x - distance for x in point], [x + distance for x in point], directory)
+
+if __name__ == "__main__":
+    #python -m omikronImporter.omikronCatalog installDirectory [catalog.sqlite] : updates the catalog of an install
+    import sys
+    with Catalog(sys.argv[2] if len(sys.argv) > 2 else defaultCatalogPath()) as catalog:
+        scanned = catalog.update(sys.argv[1])
+        fileCount, meshCount = catalog.connection.execute("SELECT count(*), sum(meshCount) FROM files").fetchone()
+        print("{0} files scanned, {1} files and {2} meshes in the catalog".format(scanned, fileCount, meshCount or 0))
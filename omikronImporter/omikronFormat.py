@@ -0,0 +1,1011 @@
+"""Omikron 3DO/3DT file parsing, without any dependency on blender.
+
+Only numpy is needed, so this can be used from plain python for scripting, profiling
+or worker processes. Main entry points:
+
+parseModelFile(path) / ParseModel(file_object, objectName) return a modelData dict:
+    "vertices"       (V, 3) float32 positions, blender axes and units, relative to "meshCenter"
+    "loopVertices"   (L,) vertex index of each face corner
+    "loopTotals"     (F,) corner count of each face
+    "UVs"            (L, 2) texture coordinates of each face corner
+    "vertexColors"   (V, 4) RGBA color of each vertex
+    "vertexNormals"  (V, 3) normal of each vertex
+    "materialIDs"    (F,) material slot of each face
+    "shaders"        {(material index, shader flags): slot}
+    "meshDescriptors", "materials"  one MeshDescriptor/Material per record of the file
+    "selectedMeshes" whether each mesh passed the MeshFilter given to ParseModel
+    "vertexRanges"   (first vertex, vertex count) of each mesh in "vertices", before the duplicate face copies
+    "isSkinned", "parents_skin", "parents_hierarchy", "mirrorNormals", "meshCenter"
+
+The readers take any binary file object. MappedFile maps a whole file in memory and
+returns zero-copy memoryview slices from read, which is what parseModelFile and
+parseTextureFile use.
+
+scanModelFile(path) / scanModel(file_object) only read the header, materials and mesh
+descriptors, and meshBounds gives the world space box of a mesh descriptor.
+
+parseTextureFile(path, materials) returns the pixels of each material of a 3DT, as flat
+RGBA float32 buffers.
+
+The section readers (readHeader, readMaterials, readMeshDescriptors, loadVertexArrays,
+LoadMeshPolygons, ReadTexture, Decompress...) can be used on their own. Vectors are
+Vector3 tuples. Records have a slot per field, read either as attributes
+(meshDescriptor.flags) or like a dict (meshDescriptor["flags"]); vertices and
+polygons are numpy arrays with one entry per field.
+"""
+import os # for path stuff
+import io
+import hashlib
+import math 
+import mmap
+from itertools import chain
+from fnmatch import fnmatchcase
+from collections.abc import Mapping
+import numpy as np
+
+from .omikronProfiling import span, count, log, DETAILED
+
+try: 
+    import struct
+except: 
+    struct = None
+
+__all__ = [
+    "Vector3", "Record", "Material", "MeshDescriptor", "MeshFilter", "MeshPolygons", "scalefactor",
+    "doNotDisplay_jointOnly", "vertexLit", "hasParent", "hasChildren", "alphaTesting", "alphablending", "additive", "substractive",
+    "mirror", "FPSarm", "faceMorph", "invisible", "skybox", "environmentMapped", "underwater", "WaterSurface", "WaterUnknown",
+    "RECTANGLE_SIZE", "TRIANGLE_SIZE", "VERTEX_SIZE", "MODEL_ARRAYS",
+    "readHeader", "readMaterial", "readMaterials", "readMeshDescriptor", "readMeshDescriptors", "readLight",
+    "loadVertexArrays", "ReadTriangles", "ReadRectangles", "ReadTriangleArrays", "ReadRectangleArrays", "LoadMeshPolygons",
+    "GenerateParentTable", "GenerateSkinTable", "DetermineSkin", "computeMeshCenter", "makeShaderFlags", "enumerateMaterials", "usedMaterials",
+    "assignDataOffsets", "usesLightMaps", "isDisplayed", "geometryHashes", "MESH_FLAGS", "meshSelected", "selectMeshes", "keepVertexRanges", "BuildVertices", "buildPolygons", "fixDuplicateFaces",
+    "MappedFile", "ParseModel", "parseModelFile", "meshBounds", "scanModel", "scanModelFile",
+    "ReadPalette", "Decompress", "DecompressBuffer", "ApplyPalette", "textureOffsets", "textureHash", "ReadTexture", "parseTextureFile",
+]
+
+###
+
+class Vector3(tuple):
+    #small stand-in for mathutils.Vector, covering what parsing needs. blender accepts it wherever a vector is expected
+    __slots__ = ()
+
+    def __new__(cls, values):
+        x, y, z = values
+        return tuple.__new__(cls, (float(x), float(y), float(z)))
+
+    x = property(lambda self: self[0])
+    y = property(lambda self: self[1])
+    z = property(lambda self: self[2])
+
+    def __add__(self, other):
+        return Vector3([a + b for a, b in zip(self, other)])
+
+    def __sub__(self, other):
+        return Vector3([a - b for a, b in zip(self, other)])
+
+    def __mul__(self, factor):
+        return Vector3([a * factor for a in self])
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Vector3([-a for a in self])
+
+    @property
+    def length(self):
+        return math.sqrt(self[0] * self[0] + self[1] * self[1] + self[2] * self[2])
+
+    def cross(self, other):
+        return Vector3([self[1] * other[2] - self[2] * other[1], self[2] * other[0] - self[0] * other[2], self[0] * other[1] - self[1] * other[0]])
+
+    def normalized(self):
+        length = self.length
+        return self * (1 / length) if length > 0 else Vector3(self)
+
+    def copy(self):
+        return Vector3(self)
+
+class Record(Mapping):
+    #fixed set of fields stored in __slots__, instead of a dict per record
+    #fields are attributes, and also readable and writable by name like a dict, which older code and json rely on
+    __slots__ = ()
+
+    def __init__(self, *values, **fields):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+        for name, value in fields.items():
+            self[name] = value
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __setitem__(self, name, value):
+        if name not in self.__slots__:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def __iter__(self):
+        return (name for name in self.__slots__ if hasattr(self, name))
+
+    def __len__(self):
+        return sum(1 for name in self)
+
+    def __repr__(self):
+        return "{0}({1})".format(type(self).__name__, dict(self))
+
+class Material(Record):
+    __slots__ = ("name", "BMPfile", "TGAfile", "dataSize", "reserved", "BPP", "width", "height")
+
+class MeshDescriptor(Record):
+    __slots__ = ("flags", "moverFlags", "meshID", "scriptID", "name", "position", "parentID", "firstChildID", "nextSiblingID",
+        "unknown07_count1", "vertexCount", "triangleCount", "rectangleCount", "unknown08", "unknown09", "unknown10", "unknown11",
+        "boxExtentNeg", "boxExtentPos", "unknown18", "unknown19", "unknown20", "bonePosition",
+        "trianglesOffset", "verticesOffset", "rectanglesOffset") #set by assignDataOffsets
+
+class MeshFilter(Record):
+    #which meshes of a file ParseModel reads. names are fnmatch patterns, any of which a mesh name must match when there
+    #are some, meshes with any of excludedFlags are left out, box is None or a world space (min, max) a mesh must meet,
+    #and meshes is None or the indices of the only meshes that may pass
+    __slots__ = ("names", "excludedFlags", "box", "meshes")
+
+class MeshPolygons(Record):
+    #polygons of a mesh, as loaded by LoadMeshPolygons
+    __slots__ = ("descriptor", "triangles", "rectangles")
+
+###
+
+scalefactor = 0.025 #1/40
+
+#mesh flags
+doNotDisplay_jointOnly = 1
+vertexLit = 1 << 2
+hasParent = 1 << 4
+hasChildren = 1 << 5
+
+alphaTesting = 1 << 11
+
+alphablending = 1 << 12
+additive = 1 << 13
+substractive = 1 << 14
+
+mirror = 1 << 20
+FPSarm = 1 << 21
+faceMorph = 1 << 22
+invisible = 1 << 23
+
+skybox = 1 << 24
+environmentMapped = 1 << 26
+underwater = 1 << 27
+WaterSurface= 1 << 29
+WaterUnknown= 1 << 30
+
+###
+# section layouts, so that each record (or whole table) is fetched with a single read
+# https://docs.python.org/3/library/struct.html#struct.Struct
+
+HEADER_STRUCT = struct.Struct("<4s2I8I180s5IQ9I84s")
+HEADER_FIELDS = ("signature", "versionMajor", "versionMinor",
+    "materialsOffset", "verticesOffset", "trianglesOffset", "rectanglesOffset", "meshesOffset", "doorsOffset", "camerasOffset", "lightsOffset",
+    "reserved", "unknown1", "unknown2", "triangleCount", "rectangleCount", "vertexCount", "reserved2",
+    "materialCount", "unknown3", "reserved3", "cameraCount", "meshCount", "doorCount",
+    "lightCount", #equals lightsunknown1 + lightunknown2
+    "lightsUnknown1", #0 in abetsy, 3 in character
+    "lightsUnknown2", #3 in abetsy, 0 in character
+    "unknown4")
+
+MATERIAL_STRUCT = struct.Struct("<20s20s20sIQIHH")
+MESH_DESCRIPTOR_STRUCT = struct.Struct("<4I20s3f3i4I4f3f3f3f3f")
+VERTEX_STRUCT = struct.Struct("<3f3fI4B")
+TRIANGLE_STRUCT = struct.Struct("<3H6B4i")
+RECTANGLE_STRUCT = struct.Struct("<4H8B4i")
+LIGHT_STRUCT = struct.Struct("<I20s2ff2f4B" + "3f20s" * 6 + "64s") #6 light points of a position and 20 unknown bytes
+
+def decodeString(raw):
+    return raw.decode("cp858").rstrip('\x00')
+
+def makeVector3(x, y, z):
+    # file y and z swapped, with the new y negated
+    return Vector3([x, z, -y])
+
+def readHeader(file_object):
+    header = dict(zip(HEADER_FIELDS, HEADER_STRUCT.unpack(file_object.read(HEADER_STRUCT.size))))
+    header["signature"] = decodeString(header["signature"])
+    header["reserved"] = bytearray(header["reserved"])
+    header["unknown4"] = bytearray(header["unknown4"])
+    return header
+
+def makeMaterial(fields):
+    return Material(decodeString(fields[0]), decodeString(fields[1]), decodeString(fields[2]), *fields[3:8])
+
+def readMaterial(file_object):
+    return makeMaterial(MATERIAL_STRUCT.unpack(file_object.read(MATERIAL_STRUCT.size)))
+
+def readMaterials(file_object, header):
+    file_object.seek(header["materialsOffset"])
+    data = file_object.read(MATERIAL_STRUCT.size * header["materialCount"])
+    return [makeMaterial(fields) for fields in MATERIAL_STRUCT.iter_unpack(data)]
+
+def makeMeshDescriptor(fields):
+    return MeshDescriptor(fields[0], fields[1], fields[2], fields[3], decodeString(fields[4]), makeVector3(*fields[5:8]) * scalefactor,
+        *fields[8:19],
+        makeVector3(*fields[19:22]) * scalefactor, makeVector3(*fields[22:25]) * scalefactor,
+        *fields[25:28],
+        makeVector3(*fields[28:31]) * scalefactor)
+
+def readMeshDescriptor(file_object):
+    return makeMeshDescriptor(MESH_DESCRIPTOR_STRUCT.unpack(file_object.read(MESH_DESCRIPTOR_STRUCT.size)))
+
+def readMeshDescriptors(file_object, header):
+    file_object.seek(header["meshesOffset"])
+    data = file_object.read(MESH_DESCRIPTOR_STRUCT.size * header["meshCount"])
+    return [makeMeshDescriptor(fields) for fields in MESH_DESCRIPTOR_STRUCT.iter_unpack(data)]
+
+def readLight(file_object):
+    fields = LIGHT_STRUCT.unpack(file_object.read(LIGHT_STRUCT.size))
+    light = dict()
+    light["flags"] = fields[0]
+    light["name"] = decodeString(fields[1])
+    light["float 1,2"] = list(fields[2:4])
+    light["intensity"] = fields[4]
+    light["angles"] = list(fields[5:7])
+    light["color"] = [value / 255 for value in fields[7:11]]
+    for i in range(6):
+        point = 11 + i * 4
+        light["position"+str(i)] = makeVector3(*fields[point:point + 3]) * scalefactor
+        light["unknown"+str(i)] = bytearray(fields[point + 3])
+    light["unknown"] = bytearray(fields[35])
+    return light
+
+VERTEX_DTYPE = np.dtype([
+    ("position", "<f4", (3,)),
+    ("normal", "<f4", (3,)),
+    ("t1", "<u4"),
+    ("color_BGRA", "u1", (4,)),
+])
+
+def swapAxes(vectors):
+    # array version of the axis swap done in makeVector3
+    swapped = vectors[:, [0, 2, 1]]
+    swapped[:, 2] *= -1
+    return swapped
+
+def loadVertexArrays(file_object, header, meshDescriptors, vertexRanges = None, fileRanges = None):
+    #vertexRanges and fileRanges, as returned by keepVertexRanges, only load the vertices of the meshes that are kept
+    #instead of the whole table
+    if vertexRanges is None:
+        vertexRanges, fileRanges = keepVertexRanges(meshDescriptors)
+    file_object.seek(header["verticesOffset"])
+
+    fullVertexCount = 0
+    for first, vertexCount in vertexRanges:
+        fullVertexCount += vertexCount
+
+    if fileRanges is None:
+        raw = np.frombuffer(file_object.read(VERTEX_DTYPE.itemsize * fullVertexCount), dtype=VERTEX_DTYPE, count=fullVertexCount)
+    else:
+        parts = []
+        for first, vertexCount in fileRanges:
+            file_object.seek(header["verticesOffset"] + first * VERTEX_DTYPE.itemsize)
+            parts.append(np.frombuffer(file_object.read(VERTEX_DTYPE.itemsize * vertexCount), dtype=VERTEX_DTYPE, count=vertexCount))
+        raw = np.concatenate(parts) if len(parts) > 0 else np.zeros(0, dtype=VERTEX_DTYPE)
+
+    vertices = dict()
+    vertices["bone"] = np.repeat(np.arange(len(vertexRanges)), [vertexCount for first, vertexCount in vertexRanges])
+    vertices["position"] = swapAxes(raw["position"]) * scalefactor
+    vertices["normal"] = swapAxes(raw["normal"])
+    vertices["t1"] = raw["t1"].copy()
+    vertices["color_ARGB"] = (raw["color_BGRA"][:, [2, 1, 0, 3]] / 255).astype(np.float32) #stored as BGRA, used as RGBA
+    return vertices
+
+def GenerateParentTable(meshes):
+    IDtoDescriptorIndex = dict()
+    for i in range(len(meshes)):
+        IDtoDescriptorIndex[meshes[i].meshID] = i;
+
+    results = [];
+    for i in range(len(meshes)):
+        if meshes[i].parentID == -1:
+            result = -1;
+        else:
+            result = IDtoDescriptorIndex[meshes[i].parentID];
+        results.append(result)
+    return results
+
+
+def GenerateSkinTable(meshes):
+    IDtoDescriptorIndex = dict()
+    for i in range(len(meshes)):
+        IDtoDescriptorIndex[meshes[i].meshID] = i;
+
+    results = []
+    for i in range(len(meshes)):
+        if meshes[i].parentID == -1:
+            result = -1;
+        else:
+            parentCandidate = IDtoDescriptorIndex[meshes[i].parentID];
+            while parentCandidate != -1 and meshes[parentCandidate].flags & doNotDisplay_jointOnly != 0:
+                parentCandidate = IDtoDescriptorIndex[meshes[parentCandidate].parentID];
+            result = parentCandidate;
+        results.append(result)
+    return results;
+
+def ReadRectangles(rectangleCount, file_object):
+    rectangles = []
+    data = file_object.read(RECTANGLE_STRUCT.size * rectangleCount)
+    for fields in RECTANGLE_STRUCT.iter_unpack(data):
+        rectangle = dict()
+        rectangle["vertex1"] = fields[0]
+        rectangle["vertex2"] = fields[1]
+        rectangle["vertex3"] = fields[2]
+        rectangle["vertex4"] = fields[3]
+        rectangle["u1"] = fields[4]
+        rectangle["v1"] = fields[5]
+        rectangle["u2"] = fields[6]
+        rectangle["v2"] = fields[7]
+        rectangle["u3"] = fields[8]
+        rectangle["v3"] = fields[9]
+        rectangle["u4"] = fields[10]
+        rectangle["v4"] = fields[11]
+        rectangle["material"] = fields[12]
+        rectangle["s2"] = fields[13]
+        rectangle["s3"] = fields[14]
+        rectangle["s4"] = fields[15]
+
+        rectangles.append(rectangle)    
+    return rectangles;
+
+def ReadTriangles(triangleCount, file_object):
+    triangles = []
+    data = file_object.read(TRIANGLE_STRUCT.size * triangleCount)
+    for fields in TRIANGLE_STRUCT.iter_unpack(data):
+        triangle = dict()
+        triangle["vertex1"] = fields[0]
+        triangle["vertex2"] = fields[1]
+        triangle["vertex3"] = fields[2]
+        triangle["u1"] = fields[3]
+        triangle["v1"] = fields[4]
+        triangle["u2"] = fields[5]
+        triangle["v2"] = fields[6]
+        triangle["u3"] = fields[7]
+        triangle["v3"] = fields[8]
+        triangle["material"] = fields[9]
+        triangle["s2"] = fields[10]
+        triangle["s3"] = fields[11]
+        triangle["s4"] = fields[12]
+
+        triangle["vertex1parented"] = triangle["vertex1"] >> 15 == 1
+        triangle["vertex2parented"] = triangle["vertex2"]  >> 15 == 1
+        triangle["vertex3parented"] = triangle["vertex3"] >> 15 == 1
+        triangle["vertex1"] = triangle["vertex1"] & 1023
+        triangle["vertex2"] = triangle["vertex2"] & 1023
+        triangle["vertex3"] = triangle["vertex3"] & 1023
+
+        triangles.append(triangle)
+    return triangles;
+
+TRIANGLE_DTYPE = np.dtype([
+    ("vertices", "<u2", (3,)),
+    ("uv", "u1", (3, 2)),
+    ("material", "<i4"),
+    ("s2", "<i4"),
+    ("s3", "<i4"),
+    ("s4", "<i4"),
+])
+
+RECTANGLE_DTYPE = np.dtype([
+    ("vertices", "<u2", (4,)),
+    ("uv", "u1", (4, 2)),
+    ("material", "<i4"),
+    ("s2", "<i4"),
+    ("s3", "<i4"),
+    ("s4", "<i4"),
+])
+
+def ReadRectangleArrays(rectangleCount, file_object):
+    raw = np.frombuffer(file_object.read(RECTANGLE_DTYPE.itemsize * rectangleCount), dtype=RECTANGLE_DTYPE, count=rectangleCount)
+    rectangles = dict()
+    rectangles["vertices"] = raw["vertices"].astype(np.int64)
+    rectangles["uv"] = raw["uv"].copy()
+    for field in ("material", "s2", "s3", "s4"):
+        rectangles[field] = raw[field].copy()
+    return rectangles
+
+def ReadTriangleArrays(triangleCount, file_object):
+    raw = np.frombuffer(file_object.read(TRIANGLE_DTYPE.itemsize * triangleCount), dtype=TRIANGLE_DTYPE, count=triangleCount)
+    triangles = dict()
+    triangles["parented"] = raw["vertices"] >> 15 == 1
+    triangles["vertices"] = (raw["vertices"] & 1023).astype(np.int64)
+    triangles["uv"] = raw["uv"].copy()
+    for field in ("material", "s2", "s3", "s4"):
+        triangles[field] = raw[field].copy()
+    return triangles
+
+def LoadMeshPolygons(header, meshDescriptor, file_object):
+    if meshDescriptor.rectangleCount > 0:
+        file_object.seek(header["rectanglesOffset"] + meshDescriptor.rectanglesOffset);
+    rectangles = ReadRectangleArrays(meshDescriptor.rectangleCount, file_object);
+
+    if meshDescriptor.triangleCount > 0:
+        file_object.seek(header["trianglesOffset"] + meshDescriptor.trianglesOffset);
+    triangles = ReadTriangleArrays(meshDescriptor.triangleCount, file_object);
+    return MeshPolygons(meshDescriptor, triangles, rectangles)
+
+def DetermineSkin(modelData):
+    for meshdata in modelData["meshes"]:
+        if meshdata.triangles["parented"].any():
+            modelData["isSkinned"] = True
+            return
+    modelData["isSkinned"] = False;
+
+def BuildVertices(meshDescriptors, vertices, meshCenter, vertexRanges = None):
+    meshPositions = np.array([meshDescriptor.position for meshDescriptor in meshDescriptors], dtype=np.float32).reshape(-1, 3)
+    if vertexRanges is None:
+        vertexRanges, fileRanges = keepVertexRanges(meshDescriptors)
+    vertexCounts = [vertexCount for first, vertexCount in vertexRanges]
+    return vertices["position"] + np.repeat(meshPositions, vertexCounts, axis=0) - np.array(meshCenter, dtype=np.float32)
+
+def buildFaces(verticesOffset, triangles, rectangles, parentVerticesOffset = None):
+    #verticesOffset is the first vertex of the mesh, parentVerticesOffset that of its skin parent, if it has one
+    triangleFaces = triangles["vertices"] + verticesOffset
+    if parentVerticesOffset is not None:
+        triangleFaces = np.where(triangles["parented"], triangles["vertices"] + parentVerticesOffset, triangleFaces)
+    rectangleFaces = rectangles["vertices"] + verticesOffset
+    return triangleFaces.tolist() + rectangleFaces.tolist()
+
+def polygonUVs(polygons, widths, heights):
+    #one (u, v) pair per corner, scaled by the size of each polygon's texture
+    sizes = np.stack([widths[polygons["material"]], heights[polygons["material"]]], axis=-1)
+    return (polygons["uv"] / sizes[:, np.newaxis, :]).reshape(-1, 2)
+
+def textureSizes(textures):
+    #widths and heights of all textures, as float arrays indexed by material
+    return np.array([texture.width for texture in textures], dtype=np.float64), np.array([texture.height for texture in textures], dtype=np.float64)
+
+def buildUVs(meshDescriptor, triangles, rectangles, textures, sizes = None):
+    widths, heights = sizes if sizes is not None else textureSizes(textures)
+    return np.concatenate([polygonUVs(triangles, widths, heights), polygonUVs(rectangles, widths, heights)])
+
+def flattenFaces(faces):
+    return np.fromiter(chain.from_iterable(faces), dtype=np.int64)
+
+def buildVColors(vertices, vertexSources):
+    #color of each vertex, copies made for duplicate faces included
+    return vertices["color_ARGB"][vertexSources]
+
+def buildNormals(vertices, vertexSources):
+    #same as colors
+    return vertices["normal"][vertexSources]
+
+def polygonSlots(polygons, shaderFlags, shaders):
+    used, inverse = np.unique(polygons["material"], return_inverse=True)
+    slots = np.array([shaders[(material, shaderFlags)] for material in used.tolist()], dtype=np.int64)
+    return slots[inverse.reshape(-1)]
+
+def buildMaterials(meshDescriptor, triangles, rectangles, shaders):
+    shaderFlags = makeShaderFlags(meshDescriptor.flags)
+    return np.concatenate([polygonSlots(triangles, shaderFlags, shaders), polygonSlots(rectangles, shaderFlags, shaders)])
+
+###
+def computeMeshCenter(meshDescriptors):
+    minX = maxX = meshDescriptors[0].position.x
+    minY = maxY = meshDescriptors[0].position.y
+    minZ = maxZ = meshDescriptors[0].position.z
+    for meshDescriptor in meshDescriptors:
+        minX = min(minX, meshDescriptor.position.x)
+        maxX = max(maxX, meshDescriptor.position.x)
+        minY = min(minY, meshDescriptor.position.y)
+        maxY = max(maxY, meshDescriptor.position.y)
+        minZ = min(minZ, meshDescriptor.position.z)
+        maxZ = max(maxZ, meshDescriptor.position.z)
+    return ((minX+maxX)/2,(minY+maxY)/2,(minZ+maxZ)/2)
+
+def makeShaderFlags(meshFlags):
+    # underwater
+    # WaterSurface
+    shaderFlags = 0
+    if meshFlags & mirror != 0:
+        shaderFlags += mirror
+        if meshFlags & additive != 0:
+            shaderFlags += additive
+        if meshFlags & substractive != 0:
+            shaderFlags += substractive
+    elif meshFlags & environmentMapped != 0:
+        shaderFlags += environmentMapped
+    elif meshFlags & alphablending != 0:
+        shaderFlags += alphablending
+        if meshFlags & additive != 0:
+            shaderFlags += additive
+        if meshFlags & substractive != 0:
+            shaderFlags += substractive
+    elif meshFlags & alphaTesting != 0:
+        shaderFlags += alphaTesting
+    if meshFlags & vertexLit != 0:
+        shaderFlags += vertexLit
+    
+    return shaderFlags
+
+def enumerateMaterials(meshes):
+    slots = dict() 
+    for mesh in meshes:
+        if mesh.descriptor.flags & invisible == 0 and mesh.descriptor.flags & doNotDisplay_jointOnly == 0:
+            shaderFlags = makeShaderFlags(mesh.descriptor.flags)
+
+            #dict.fromkeys keeps materials in order of first use
+            for polygons in (mesh.triangles, mesh.rectangles):
+                for material in dict.fromkeys(polygons["material"].tolist()):
+                    if not (material, shaderFlags) in slots:
+                        slots[(material, shaderFlags)]=len(slots)
+    return slots
+
+def usedMaterials(shaders):
+    #materials referenced by at least one slot, the only textures that need decoding
+    return set(material for material, shaderFlags in shaders)
+
+def computeMirrorNormal(verticesOffset, vertices, triangles, rectangles):
+    normal = [1,0,0]
+    if len(triangles["vertices"]) > 0:
+        vertex1, vertex2, vertex3 = (triangles["vertices"][0, :3] + verticesOffset).tolist()
+    elif len(rectangles["vertices"]) > 0:
+        vertex1, vertex2, vertex3 = (rectangles["vertices"][0, :3] + verticesOffset).tolist()
+    v1 = Vector3(vertices[vertex2]) - Vector3(vertices[vertex1])
+    v2 = Vector3(vertices[vertex3]) - Vector3(vertices[vertex1])
+    normal = v1.cross(v2).normalized()
+    return Vector3(normal)
+
+def fixDuplicateFaces(loopVertices, loopTotals, vertexCount):
+    #faces using the same vertices as an earlier face get their own copies of them, appended in face and corner order
+    #returns the new loopVertices, and the original vertex each vertex is a copy of, to index any per vertex data with
+    faceCount = len(loopTotals)
+    if faceCount == 0:
+        return loopVertices, np.arange(vertexCount)
+    #canonical form of each face: its sorted vertex indices, padded with -1 to the largest corner count
+    loopStarts = np.cumsum(loopTotals) - loopTotals
+    faceIndices = np.repeat(np.arange(faceCount), loopTotals)
+    rows = np.full((faceCount, int(loopTotals.max())), -1, dtype=np.int64)
+    rows[faceIndices, np.arange(len(loopVertices)) - loopStarts[faceIndices]] = loopVertices
+    rows.sort(axis=1)
+    keys = rows.view(np.dtype((np.void, rows.itemsize * rows.shape[1]))).ravel() #one opaque key per row
+    firstFaces = np.unique(keys, return_index=True)[1] #return_index gives the first occurrence of each key
+    duplicates = np.ones(faceCount, dtype=bool)
+    duplicates[firstFaces] = False
+
+    duplicateLoops = np.repeat(duplicates, loopTotals)
+    log(DETAILED, "duplicate faces: {0}", np.flatnonzero(duplicates))
+    count("duplicate faces fixed", faceCount - len(firstFaces))
+    copiedVertices = loopVertices[duplicateLoops]
+    loopVertices = loopVertices.copy()
+    loopVertices[duplicateLoops] = np.arange(vertexCount, vertexCount + len(copiedVertices))
+    return loopVertices, np.concatenate([np.arange(vertexCount), copiedVertices])
+
+#def checkDegenFaces(faces):
+    
+MODEL_ARRAYS = ("vertices", "loopVertices", "loopTotals", "UVs", "vertexColors", "vertexNormals", "materialIDs")
+
+RECTANGLE_SIZE = 32;
+TRIANGLE_SIZE = 28;
+VERTEX_SIZE = 32;
+
+def assignDataOffsets(meshDescriptors):
+    #now that mesh descriptors are read we'll buid absolute offsets to their data
+    trianglesOffset = 0; #in bytes
+    rectanglesOffset = 0; #in bytes
+    verticesOffset = 0; # in vertices
+
+    for meshDescriptor in meshDescriptors:
+        meshDescriptor.trianglesOffset = trianglesOffset
+        meshDescriptor.verticesOffset = verticesOffset
+        meshDescriptor.rectanglesOffset = rectanglesOffset
+        rectanglesOffset += meshDescriptor.rectangleCount * RECTANGLE_SIZE
+        trianglesOffset += meshDescriptor.triangleCount * TRIANGLE_SIZE
+        verticesOffset += meshDescriptor.vertexCount
+        #print(meshDescriptor)
+
+MESH_FLAGS = {name: globals()[name] for name in ("vertexLit", "alphaTesting", "alphablending", "additive", "substractive", "mirror",
+    "FPSarm", "faceMorph", "skybox", "environmentMapped", "underwater", "WaterSurface", "WaterUnknown")} #the ones a MeshFilter can exclude
+
+def meshSelected(meshFilter, meshDescriptor):
+    name = meshDescriptor.name.lower()
+    if meshFilter.names and not any(fnmatchcase(name, pattern.lower()) for pattern in meshFilter.names):
+        return False
+    if meshDescriptor.flags & meshFilter.excludedFlags != 0:
+        return False
+    if meshFilter.box is not None:
+        low, high = meshBounds(meshDescriptor)
+        boxLow, boxHigh = meshFilter.box
+        return all(low[axis] <= boxHigh[axis] and high[axis] >= boxLow[axis] for axis in range(3))
+    return True
+
+def selectMeshes(meshDescriptors, meshFilter = None):
+    #whether each mesh passes meshFilter
+    if meshFilter is None:
+        return [True] * len(meshDescriptors)
+    meshes = range(len(meshDescriptors)) if meshFilter.meshes is None else set(meshFilter.meshes)
+    return [i in meshes and meshSelected(meshFilter, meshDescriptor) for i, meshDescriptor in enumerate(meshDescriptors)]
+
+def keepVertexRanges(meshDescriptors, kept = None):
+    #leaves out the vertices of the meshes that aren't kept, the descriptors are left as read. returns the vertexRanges,
+    #(first vertex, vertex count) of each mesh once the kept vertices follow each other, a count of 0 for those left out,
+    #and the (first vertex, vertex count) ranges of the file loadVertexArrays has to read, None for the whole table when
+    #every mesh is kept. needs the offsets set by assignDataOffsets
+    if kept is None:
+        return [(meshDescriptor.verticesOffset, meshDescriptor.vertexCount) for meshDescriptor in meshDescriptors], None
+    vertexRanges = []
+    fileRanges = []
+    verticesOffset = 0
+    for meshDescriptor, keep in zip(meshDescriptors, kept):
+        vertexCount = meshDescriptor.vertexCount if keep else 0
+        if keep:
+            fileRanges.append((meshDescriptor.verticesOffset, vertexCount))
+        vertexRanges.append((verticesOffset, vertexCount))
+        verticesOffset += vertexCount
+    return vertexRanges, fileRanges
+
+def usesLightMaps(meshDescriptors, objectName):
+    #not all meshes are correctly tagged to use baked vertex lighting, good approximation is that if at least one mesh in a file is, all should be
+    if objectName == "VIR_FN": #special fix for virtual fighter, to make it fully bright
+        return True
+    return any(meshDescriptor.flags & vertexLit != 0 for meshDescriptor in meshDescriptors)
+
+def isDisplayed(meshDescriptor):
+    return meshDescriptor.flags & invisible == 0 and meshDescriptor.flags & doNotDisplay_jointOnly == 0
+
+def geometryHashes(file_object, header, meshDescriptors, materialKeys, useLightMaps):
+    #sha1 of what each mesh looks like relative to its position: vertices, polygons, UVs, shading, and materialKeys
+    #standing for the textures, so that meshes of different files compare too. meshes that can't be shared get None:
+    #hidden ones, those with probes, and every mesh of skinned models. needs the offsets set by assignDataOffsets
+    hashes = []
+    for meshDescriptor in meshDescriptors:
+        flags = meshDescriptor.flags | vertexLit if useLightMaps else meshDescriptor.flags
+        if not isDisplayed(meshDescriptor) or flags & (mirror | environmentMapped) != 0:
+            hashes.append(None)
+            continue
+        file_object.seek(header["verticesOffset"] + meshDescriptor.verticesOffset * VERTEX_SIZE)
+        vertices = file_object.read(meshDescriptor.vertexCount * VERTEX_SIZE)
+        file_object.seek(header["trianglesOffset"] + meshDescriptor.trianglesOffset)
+        triangles = np.frombuffer(file_object.read(TRIANGLE_DTYPE.itemsize * meshDescriptor.triangleCount), dtype=TRIANGLE_DTYPE).copy()
+        file_object.seek(header["rectanglesOffset"] + meshDescriptor.rectanglesOffset)
+        rectangles = np.frombuffer(file_object.read(RECTANGLE_DTYPE.itemsize * meshDescriptor.rectangleCount), dtype=RECTANGLE_DTYPE).copy()
+        if (triangles["vertices"] >> 15 == 1).any():
+            return [None] * len(meshDescriptors)
+
+        hasher = hashlib.sha1("{0}|{1}|{2}|{3}|".format(makeShaderFlags(flags), meshDescriptor.vertexCount, len(triangles), len(rectangles)).encode("utf-8"))
+        hasher.update(vertices)
+        for polygons in (triangles, rectangles):
+            hasher.update("|".join(materialKeys[material] for material in polygons["material"].tolist()).encode("utf-8"))
+            polygons["material"] = 0 #material indices only make sense within a file
+            hasher.update(polygons.tobytes())
+        hashes.append(hasher.hexdigest())
+    return hashes
+
+def buildPolygons(modelData, meshDescriptors, materials, shaders):
+    #faces, per corner UVs and per face material slots of all displayed meshes
+    faces = []
+    UVs = []
+    materialIDs = []
+    sizes = textureSizes(materials)
+    vertexRanges = modelData["vertexRanges"]
+    #meshes leaves out invisible and unselected meshes, so their descriptor index can differ from their index in it
+    descriptorIndices = {id(meshDescriptor): i for i, meshDescriptor in enumerate(meshDescriptors)}
+
+    for mesh in modelData["meshes"]:
+        i = descriptorIndices[id(mesh.descriptor)]
+        parentVerticesOffset = None
+        if modelData["isSkinned"] and modelData["parents_skin"][i] != -1:
+            parentVerticesOffset = vertexRanges[modelData["parents_skin"][i]][0]
+        if mesh.descriptor.flags & invisible == 0 and mesh.descriptor.flags & doNotDisplay_jointOnly == 0:
+            faces.extend(buildFaces(vertexRanges[i][0], mesh.triangles, mesh.rectangles, parentVerticesOffset))
+            UVs.append(buildUVs(mesh.descriptor, mesh.triangles, mesh.rectangles, materials, sizes))
+            materialIDs.append(buildMaterials(mesh.descriptor, mesh.triangles, mesh.rectangles, shaders))
+    UVs = np.concatenate(UVs) if len(UVs) > 0 else np.zeros((0, 2))
+    materialIDs = np.concatenate(materialIDs) if len(materialIDs) > 0 else np.zeros(0, dtype=np.int64)
+    return faces, UVs, materialIDs
+
+def ParseModel(file_object, objectName, meshFilter = None):
+    #everything up to, but not including, the blender data
+    #with a meshFilter, the polygons and vertices of the meshes it rejects are never read
+    with span("header"):
+        header = readHeader(file_object)
+        #print(header)
+
+        materials = readMaterials(file_object, header)
+
+        for material in materials:
+            log(DETAILED, "{0}", material)
+
+        meshDescriptors = readMeshDescriptors(file_object, header)
+
+        assignDataOffsets(meshDescriptors)
+
+    modelData = dict()
+    modelData["parents_hierarchy"] = GenerateParentTable(meshDescriptors)
+    modelData["parents_skin"] = GenerateSkinTable(meshDescriptors)
+    selected = selectMeshes(meshDescriptors, meshFilter)
+    modelData["selectedMeshes"] = selected
+
+    with span("vertices"):
+        kept = None
+        if meshFilter is not None:
+            #parented polygons use vertices of their skin parent
+            kept = list(selected)
+            for i, parent in enumerate(modelData["parents_skin"]):
+                if selected[i] and parent != -1:
+                    kept[parent] = True
+            count("meshes filtered out", selected.count(False))
+        vertexRanges, fileRanges = keepVertexRanges(meshDescriptors, kept)
+        modelData["vertexRanges"] = vertexRanges
+        rawVertices = loadVertexArrays(file_object, header, meshDescriptors, vertexRanges, fileRanges)
+
+    with span("polygons"):
+        meshes = []
+        for meshDescriptor, isSelected in zip(meshDescriptors, selected):
+            if meshDescriptor.flags & invisible == 0 and isSelected:
+                meshes.append(LoadMeshPolygons(header, meshDescriptor, file_object))
+        modelData["meshes"] = meshes
+
+    lights = []
+    log(DETAILED, "light count: {0}", header["lightCount"])
+    log(DETAILED, "lightsUnknown1 count: {0}", header["lightsUnknown1"])
+    log(DETAILED, "lightsUnknown2 count: {0}", header["lightsUnknown2"])
+    if header["lightsUnknown2"] > 0:
+        file_object.seek(header["lightsOffset"])
+        for i in range(header["lightsUnknown2"]):
+            lights.append(readLight(file_object))
+            log(DETAILED, "{0}", lights[i])
+
+    #process the loaded data
+    DetermineSkin(modelData)
+
+    if usesLightMaps(meshDescriptors, objectName):
+        for meshDescriptor in meshDescriptors:
+            meshDescriptor.flags = meshDescriptor.flags | vertexLit
+    shaders = enumerateMaterials(meshes)
+
+    meshCenter = computeMeshCenter([meshDescriptor for meshDescriptor, isSelected in zip(meshDescriptors, selected) if isSelected] or meshDescriptors)
+    vertices = BuildVertices(meshDescriptors, rawVertices, meshCenter, vertexRanges)
+
+    log(DETAILED, "model is skinned: {0}", modelData["isSkinned"])
+    with span("faces"):
+        faces, UVs, materialIDs = buildPolygons(modelData, meshDescriptors, materials, shaders)
+
+    with span("arrays"):
+        loopVertices = flattenFaces(faces)
+        loopTotals = np.fromiter((len(face) for face in faces), dtype=np.int32, count=len(faces))
+        modelData["meshDescriptors"] = meshDescriptors
+        modelData["materials"] = materials
+        modelData["shaders"] = shaders
+        modelData["meshCenter"] = meshCenter
+        modelData["loopTotals"] = loopTotals
+        modelData["UVs"] = UVs
+        modelData["materialIDs"] = materialIDs
+
+    with span("duplicate faces"):
+        modelData["loopVertices"], vertexSources = fixDuplicateFaces(loopVertices, loopTotals, len(vertices))
+        modelData["vertices"] = vertices[vertexSources]
+        modelData["vertexColors"] = buildVColors(rawVertices, vertexSources)
+        modelData["vertexNormals"] = buildNormals(rawVertices, vertexSources)
+
+    #mirror probes are oriented after their first polygon
+    mirrorNormals = dict()
+    descriptorIndices = {id(meshDescriptor): i for i, meshDescriptor in enumerate(meshDescriptors)}
+    for meshdata in modelData["meshes"]:
+        if meshdata.descriptor.flags & mirror !=0:
+            i = descriptorIndices[id(meshdata.descriptor)]
+            mirrorNormals[i] = computeMirrorNormal(vertexRanges[i][0], vertices, meshdata.triangles, meshdata.rectangles)
+    modelData["mirrorNormals"] = mirrorNormals
+
+    count("vertices", len(modelData["vertices"]))
+    count("faces", len(modelData["loopTotals"]))
+    return modelData
+
+def ReadPalette(file_object, colorCount):
+    #(colorCount, 4) RGBA float array, pure black is transparent
+    rgb = np.frombuffer(file_object.read(colorCount * 3), dtype=np.uint8).reshape(-1, 3)
+    palette = np.empty((len(rgb), 4), dtype=np.float32)
+    palette[:, :3] = rgb / 255
+    palette[:, 3] = rgb.any(axis=1)
+    return palette
+
+def copySequence(result, start, end, offset):
+    #back-reference copy of result[start:end] from (offset) pixels earlier
+    if offset == 0:
+        raise Exception("invalid sequence offset")
+    if offset > start:
+        #the part pointing before the first pixel is black, and result is preallocated with zeros
+        start = min(offset, end)
+    length = end - start
+    if length <= 0:
+        return
+    source = start - offset
+    if offset >= length:
+        result[start:end] = result[source:source + length]
+    else:
+        #overlapping copy, repeats the last (offset) pixels
+        pattern = result[source:start]
+        result[start:end] = (pattern * (length // offset + 1))[:length]
+
+def DecompressBuffer(data, compressedSize, uncompressedSize):
+    #data is the compressed block, plus the few bytes after it a last sequence may still read
+    if compressedSize == 65536:
+        return bytearray(data[:compressedSize])
+    result = bytearray(uncompressedSize)
+    result[0] = data[0] # first byte isn't compressed
+    currentByte = 1
+    position = 1
+    while currentByte < uncompressedSize:
+        flags = data[position]
+        position += 1
+        for flagIndex in range(8):
+            if flags & (0x80 >> flagIndex) != 0:
+                sequenceDescription = data[position]
+                position += 1
+                sequenceType = sequenceDescription & 3
+                sequenceSize = (sequenceDescription >> 2) + 3
+                if sequenceType == 0:
+                    # répétition du pixel précédent 
+                    # (pixel précédent inclus dans la taille de la séquence) 
+                    offset = 1
+                    sequenceSize -= 1
+                elif sequenceType == 1:
+                    # copie d'une séquence de pixels,
+                    # (n) pixels avant le pixel précédent (prochain octet = valeur de n)
+                    offset = 1 + data[position]
+                    position += 1
+                elif sequenceType == 2:
+                    # copie d'une séquence de pixels,
+                    # (n) pixels avant le pixel précédent (2 prochains octets = valeur de n)
+                    offset = 1 + (data[position] << 8) + data[position + 1]
+                    position += 2
+                else:
+                    # copie d'une séquence de pixels, (n) pixels avant le pixel précédent
+                    # (n = (256 * prochain octet) -1)
+                    offset = data[position] * 256
+                    position += 1
+
+                end = min(currentByte + sequenceSize, uncompressedSize)
+                copySequence(result, currentByte, end, offset)
+                currentByte = end
+                if currentByte >= uncompressedSize:
+                    return result
+            else:
+                result[currentByte] = data[position]
+                position += 1
+                currentByte += 1
+                if currentByte >= uncompressedSize:
+                    return result
+
+            if position >= compressedSize:
+                return result[:currentByte]
+    return result
+
+def Decompress(file_object, compressedSize, uncompressedSize):
+    # the end of block check only happens between sequences, so the last one can read a few bytes past it
+    return DecompressBuffer(file_object.read(compressedSize + 4), compressedSize, uncompressedSize)
+
+def ApplyPalette(palette, texture):
+    #flat RGBA buffer, ready for image.pixels.foreach_set
+    return palette[np.frombuffer(texture, dtype=np.uint8)].ravel()
+
+def textureOffsets(materials):
+    #textures are stored one after the other in the 3DT, each as a palette followed by compressed data
+    offsets = []
+    offset = 0
+    for material in materials:
+        offsets.append(offset)
+        offset += material.dataSize + 2**material.BPP * 3
+    return offsets
+
+def textureHash(file_object, material, offset):
+    #hash of a texture as stored, palette and compressed data. textures stored the same way decode the same way
+    file_object.seek(offset)
+    digest = hashlib.sha1("{0}x{1}x{2}|".format(material.width, material.height, material.BPP).encode("ascii"))
+    digest.update(file_object.read(2**material.BPP * 3 + material.dataSize))
+    return digest.hexdigest()
+
+def ReadTexture(file_object, material):
+    colorCount = 2**material.BPP
+    palette = ReadPalette(file_object, colorCount)
+    with span("decompress"):
+        indexTexture = Decompress(file_object, material.dataSize, material.width * material.height)
+    count("texture bytes decompressed", len(indexTexture))
+    with span("palette"):
+        return ApplyPalette(palette, indexTexture)
+
+###
+
+class MappedFile:
+    #read only file object over a memory map of a whole file. seek only moves the position and read returns
+    #a memoryview slice of the map, so the readers get at each section through the header offsets without any copy
+    def __init__(self, path):
+        self.name = path
+        self.position = 0
+        with open(path, "rb") as file_in:
+            try:
+                self.mapping = mmap.mmap(file_in.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError: #empty files can't be mapped
+                self.mapping = None
+        self.view = memoryview(self.mapping if self.mapping is not None else b"")
+
+    def read(self, size = -1):
+        start = min(self.position, len(self.view))
+        end = len(self.view) if size is None or size < 0 else min(start + size, len(self.view))
+        self.position = end
+        return self.view[start:end]
+
+    def seek(self, offset, whence = io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        if offset < 0:
+            raise ValueError("negative seek position {0}".format(offset))
+        self.position = offset
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def close(self):
+        self.view.release()
+        if self.mapping is not None:
+            try:
+                self.mapping.close()
+            except BufferError:
+                pass #slices are still in use somewhere, the map is closed once they are garbage collected
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+def parseModelFile(modelFilePath, objectName = None, meshFilter = None):
+    if objectName is None:
+        objectName = os.path.splitext(os.path.basename(modelFilePath))[0]
+    with MappedFile(modelFilePath) as model_in:
+        return ParseModel(model_in, objectName, meshFilter)
+
+def meshBounds(meshDescriptor):
+    #world space (min, max) corners of the box of a mesh, whose extents are relative to its position
+    low = meshDescriptor.position + meshDescriptor.boxExtentNeg
+    high = meshDescriptor.position + meshDescriptor.boxExtentPos
+    return Vector3(map(min, low, high)), Vector3(map(max, low, high)) #the axis swap can turn the extents around
+
+def scanModel(file_object):
+    #header, materials and mesh descriptors only, leaving vertices and polygons unread
+    with span("scan"):
+        header = readHeader(file_object)
+        materials = readMaterials(file_object, header)
+        meshDescriptors = readMeshDescriptors(file_object, header)
+    return header, materials, meshDescriptors
+
+def scanModelFile(modelFilePath):
+    with MappedFile(modelFilePath) as model_in:
+        return scanModel(model_in)
+
+def parseTextureFile(textureFilePath, materials):
+    textureImages = []
+    with MappedFile(textureFilePath) as textures_in:
+        for material, offset in zip(materials, textureOffsets(materials)):
+            textures_in.seek(offset)
+            textureImages.append(ReadTexture(textures_in, material))
+    return textureImages
+
+if __name__ == "__main__":
+    #python -m omikronImporter.omikronFormat model.3do : parses a model (and its 3DT) outside of blender
+    import sys
+    import time
+    for modelFilePath in sys.argv[1:]:
+        then = time.perf_counter()
+        modelData = parseModelFile(modelFilePath)
+        print("{0}: {1} meshes, {2} vertices, {3} faces, {4} material slots, parsed in {5:.3f} seconds".format(
+            modelFilePath, len(modelData["meshDescriptors"]), len(modelData["vertices"]), len(modelData["loopTotals"]), len(modelData["shaders"]), time.perf_counter() - then))
+        textureFilePath = modelFilePath[:-3] + "3dt"
+        if os.path.exists(textureFilePath):
+            then = time.perf_counter()
+            textureImages = parseTextureFile(textureFilePath, modelData["materials"])
+            print("{0}: {1} textures decoded in {2:.3f} seconds".format(textureFilePath, len(textureImages), time.perf_counter() - then))
+    from .omikronProfiling import getProfiler
+    print(getProfiler().table())
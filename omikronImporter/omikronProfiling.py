@@ -0,0 +1,152 @@
+# timing spans, counters and logging for the import pipeline, without any dependency on blender
+# parsing code reports to the active Profiler through span/count/log, so it works the same with or without one set up
+import io
+import json
+import time
+import pstats
+import cProfile
+from contextlib import contextmanager
+
+#verbosity levels
+QUIET = 0 #nothing is printed
+SUMMARY = 1 #one line per file and the timing table
+DETAILED = 2 #materials, lights, duplicate faces... as they are read
+
+class StatsSource:
+    #lets pstats load statistics collected in another process
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+class Profiler:
+    def __init__(self, verbosity = QUIET, useCProfile = False):
+        self.verbosity = verbosity
+        self.useCProfile = useCProfile
+        self.spans = dict() #path: [calls, seconds]
+        self.counters = dict()
+        self.stack = []
+        self.profile = None
+        self.profileStats = None #pstats.Stats, collected from this process and the workers
+
+    def settings(self):
+        #what a worker process needs to build its own profiler
+        return (self.verbosity, self.useCProfile)
+
+    @contextmanager
+    def span(self, name):
+        #times the enclosed block. nested spans are reported as "outer/inner"
+        self.stack.append(name)
+        entry = self.spans.setdefault("/".join(self.stack), [0, 0.0]) #added on entry, so parents are listed before their children
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+            self.stack.pop()
+
+    def count(self, name, amount = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def log(self, level, message, *arguments):
+        #message is only formatted when it's going to be printed
+        if self.verbosity >= level:
+            print(message.format(*arguments) if arguments else message)
+
+    @contextmanager
+    def profiling(self):
+        #runs the enclosed block under cProfile, when enabled
+        if not self.useCProfile:
+            yield
+            return
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        try:
+            yield
+        finally:
+            self.profile.disable()
+            self.addProfileStats(pstats.Stats(self.profile))
+            self.profile = None
+
+    def addProfileStats(self, stats):
+        if self.profileStats is None:
+            self.profileStats = stats
+        else:
+            self.profileStats.add(stats)
+
+    def merge(self, report):
+        #adds the report of another profiler, typically from a worker process
+        for path, span in report["spans"].items():
+            entry = self.spans.setdefault(path, [0, 0.0])
+            entry[0] += span["calls"]
+            entry[1] += span["seconds"]
+        for name, amount in report["counters"].items():
+            self.count(name, amount)
+        if report.get("profileStats"):
+            self.addProfileStats(pstats.Stats(StatsSource(report["profileStats"])))
+
+    def report(self, includeProfileStats = False):
+        #json serializable summary. includeProfileStats adds the raw cProfile data, to be merged by another profiler
+        report = {
+            "spans": {path: {"calls": calls, "seconds": seconds} for path, (calls, seconds) in self.spans.items()},
+            "counters": dict(self.counters),
+        }
+        if includeProfileStats and self.profileStats is not None:
+            report["profileStats"] = self.profileStats.stats
+        return report
+
+    def profileText(self, limit = 30):
+        if self.profileStats is None:
+            return ""
+        stream = io.StringIO()
+        self.profileStats.stream = stream
+        self.profileStats.sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+    def table(self):
+        #spans in the order they were first entered, each followed by its children, then counters
+        order = {path: i for i, path in enumerate(self.spans)}
+        def treeOrder(path):
+            names = path.split("/")
+            return [order.get("/".join(names[:depth + 1]), -1) for depth in range(len(names))]
+        lines = ["{0:<40} {1:>8} {2:>12}".format("stage", "calls", "seconds")]
+        for path in sorted(self.spans, key=treeOrder):
+            calls, seconds = self.spans[path]
+            depth = path.count("/")
+            lines.append("{0:<40} {1:>8} {2:>12.4f}".format("  " * depth + path.rsplit("/", 1)[-1], calls, seconds))
+        if self.counters:
+            lines.append("")
+            lines.append("{0:<40} {1:>21}".format("counter", "total"))
+            for name, amount in self.counters.items():
+                lines.append("{0:<40} {1:>21}".format(name, amount))
+        return "\n".join(lines)
+
+    def writeReport(self, path):
+        report = self.report()
+        if self.profileStats is not None:
+            report["profile"] = self.profileText()
+        with open(path, "w") as report_out:
+            json.dump(report, report_out, indent=2)
+
+activeProfiler = Profiler()
+
+def getProfiler():
+    return activeProfiler
+
+def setProfiler(profiler):
+    #makes profiler the active one and returns the previous one, to be restored afterwards
+    global activeProfiler
+    previous = activeProfiler
+    activeProfiler = profiler
+    return previous
+
+def span(name):
+    return activeProfiler.span(name)
+
+def count(name, amount = 1):
+    activeProfiler.count(name, amount)
+
+def log(level, message, *arguments):
+    activeProfiler.log(level, message, *arguments)
@@ -0,0 +1,211 @@
+# file loading entry points that don't need blender, so they can run in worker processes
+import os # for path stuff
+import ntpath
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from .omikronCache import *
+from .omikronProfiling import Profiler, getProfiler, setProfiler, span, count, log, SUMMARY
+
+#which textures LoadFile decodes
+TEXTURES_ALL = "ALL" #every texture of the 3DT
+TEXTURES_USED = "USED" #only those of materials some face uses
+TEXTURES_DEFERRED = "DEFERRED" #none, they are decoded later when first displayed
+
+BATCH_PIXELS = 512 * 512 #textures are decoded in worker processes in batches of at least this many pixels
+POOL_MIN_FILES = 2 #fewer files are loaded in this process, starting the workers would cost more than it saves
+
+def modelObjectName(modelFilePath):
+    return ntpath.basename(modelFilePath[:-4])
+
+def textureFilePath(modelFilePath):
+    #matching 3DT in the same directory, which is always the case in standard Omikron installs
+    return modelFilePath[:-3] + "3dt"
+
+def texturesToDecode(modelData, textureLoading):
+    #indices of the materials whose texture LoadFile decodes
+    if textureLoading == TEXTURES_DEFERRED:
+        return []
+    if textureLoading == TEXTURES_USED:
+        return sorted(usedMaterials(modelData["shaders"]))
+    return list(range(len(modelData["materials"])))
+
+def textureBatches(materials, indices, batchCount):
+    #splits the textures into at most batchCount groups of similar pixel counts, none smaller than BATCH_PIXELS
+    pixels = [materials[index]["width"] * materials[index]["height"] for index in indices]
+    batchCount = max(1, min(batchCount, sum(pixels) // BATCH_PIXELS))
+    batches = [[] for i in range(batchCount)]
+    sizes = [0] * batchCount
+    for index, size in sorted(zip(indices, pixels), key=lambda texture: -texture[1]):
+        smallest = sizes.index(min(sizes))
+        batches[smallest].append(index)
+        sizes[smallest] += size
+    return [sorted(batch) for batch in batches if len(batch) > 0]
+
+def HashTextures(textureFilePath, materials):
+    #textureHash of every material, cheap next to decoding, as only hashing is involved
+    with MappedFile(textureFilePath) as textures_in:
+        return [textureHash(textures_in, material, offset) for material, offset in zip(materials, textureOffsets(materials))]
+
+def LoadModelFile(modelFilePath, cacheSettings = None, meshFilter = None):
+    #cacheSettings is None or (cacheDirectory, cacheSize in bytes)
+    modelCache = openCaches(*cacheSettings)[0] if cacheSettings is not None else None
+    with span("model"), MappedFile(modelFilePath) as model_in:
+        modelData = LoadModel(model_in, modelObjectName(modelFilePath), modelCache, meshFilter)
+    modelData.pop("meshes", None) #polygons are only needed while parsing
+    return modelData
+
+def LoadTextureBatch(textureFilePath, materials, indices, cacheSettings = None):
+    #[(material index, pixels)] of the given materials, offsets coming from the table of the whole file
+    textureCache = openCaches(*cacheSettings)[1] if cacheSettings is not None else None
+    offsets = textureOffsets(materials)
+    with span("textures"), MappedFile(textureFilePath) as textures_in:
+        return [(index, LoadTexture(textures_in, materials[index], index, offsets[index], textureCache)) for index in indices]
+
+def LoadFile(modelFilePath, cacheSettings = None, textureLoading = TEXTURES_ALL, meshFilter = None):
+    #parses a 3DO and decodes the textures of its 3DT, if there is one
+    #textureImages has an entry per material, None for those that weren't decoded
+    modelData = LoadModelFile(modelFilePath, cacheSettings, meshFilter)
+
+    textureImages = None
+    if os.path.exists(textureFilePath(modelFilePath)):
+        textureImages = [None] * len(modelData["materials"])
+        indices = texturesToDecode(modelData, textureLoading)
+        if len(indices) > 0:
+            for index, imageData in LoadTextureBatch(textureFilePath(modelFilePath), modelData["materials"], indices, cacheSettings):
+                textureImages[index] = imageData
+    return modelFilePath, modelData, textureImages
+
+def meshTiles(meshDescriptors, selected, tileSize):
+    #[((x, y), mesh indices)] grouping the selected, displayed meshes by the square of a ground grid their box center is in
+    tiles = dict()
+    for i, (meshDescriptor, isSelected) in enumerate(zip(meshDescriptors, selected)):
+        if not isSelected or meshDescriptor.flags & invisible != 0 or meshDescriptor.flags & doNotDisplay_jointOnly != 0:
+            continue
+        low, high = meshBounds(meshDescriptor)
+        tiles.setdefault((math.floor((low.x + high.x) / 2 / tileSize), math.floor((low.y + high.y) / 2 / tileSize)), []).append(i)
+    return sorted(tiles.items())
+
+def LoadTiles(modelFilePath, cacheSettings = None, tileSize = 100.0, meshFilter = None):
+    #yields (object name, modelData) for each tile of a model. only the meshes of the current tile are parsed,
+    #so memory use follows the size of the tiles rather than that of the file
+    modelCache = openCaches(*cacheSettings)[0] if cacheSettings is not None else None
+    objectName = modelObjectName(modelFilePath)
+    with MappedFile(modelFilePath) as model_in:
+        header, materials, meshDescriptors = scanModel(model_in)
+        tiles = meshTiles(meshDescriptors, selectMeshes(meshDescriptors, meshFilter), tileSize)
+        for (x, y), meshes in tiles:
+            model_in.seek(0)
+            with span("model"):
+                modelData = LoadModel(model_in, objectName, modelCache, MeshFilter((), 0, None, tuple(meshes)))
+            modelData.pop("meshes", None)
+            count("tiles")
+            yield ("{0}_{1}_{2}".format(objectName, x, y) if len(tiles) > 1 else objectName), modelData
+
+def LoadInstancedModel(modelFilePath, cacheSettings = None, meshFilter = None, knownHashes = ()):
+    #splits a model into the meshes whose geometry repeats, within the file or with one of knownHashes, and the rest.
+    #yields (object name, modelData, geometryHash, placements): the rest first, with geometryHash None, then each repeated
+    #geometry once, parsed from its first mesh, or modelData None when its hash is one of knownHashes.
+    #placements are the (name, position) of every mesh using the geometry
+    modelCache = openCaches(*cacheSettings)[0] if cacheSettings is not None else None
+    objectName = modelObjectName(modelFilePath)
+    with MappedFile(modelFilePath) as model_in:
+        with span("geometry hashes"):
+            header, materials, meshDescriptors = scanModel(model_in)
+            assignDataOffsets(meshDescriptors)
+            if os.path.exists(textureFilePath(modelFilePath)):
+                materialKeys = HashTextures(textureFilePath(modelFilePath), materials)
+            else:
+                materialKeys = ["{0}|{1}x{2}x{3}".format(material.name, material.width, material.height, material.BPP) for material in materials]
+            hashes = geometryHashes(model_in, header, meshDescriptors, materialKeys, usesLightMaps(meshDescriptors, objectName))
+
+        selected = selectMeshes(meshDescriptors, meshFilter)
+        geometries = dict() #geometry hash: mesh indices
+        for i, geometryHash in enumerate(hashes):
+            if selected[i] and geometryHash is not None:
+                geometries.setdefault(geometryHash, []).append(i)
+        geometries = {geometryHash: meshes for geometryHash, meshes in geometries.items() if len(meshes) > 1 or geometryHash in knownHashes}
+        instanced = set(i for meshes in geometries.values() for i in meshes)
+        count("instanced meshes", len(instanced))
+
+        rest = [i for i, isSelected in enumerate(selected) if isSelected and i not in instanced]
+        if any(isDisplayed(meshDescriptors[i]) for i in rest):
+            model_in.seek(0)
+            with span("model"):
+                modelData = LoadModel(model_in, objectName, modelCache, MeshFilter((), 0, None, tuple(rest)) if len(instanced) > 0 else meshFilter)
+            modelData.pop("meshes", None)
+            yield objectName, modelData, None, []
+
+        for geometryHash, meshes in geometries.items():
+            modelData = None
+            if geometryHash not in knownHashes:
+                model_in.seek(0)
+                with span("model"):
+                    modelData = LoadModel(model_in, objectName, modelCache, MeshFilter((), 0, None, (meshes[0],)))
+                modelData.pop("meshes", None)
+            yield meshDescriptors[meshes[0]].name, modelData, geometryHash, [(meshDescriptors[i].name, meshDescriptors[i].position) for i in meshes]
+
+def runProfiled(profileSettings, function, *arguments):
+    #runs function in a worker process, reporting to a profiler of its own whose report is merged back by LoadFiles
+    profiler = Profiler(*profileSettings)
+    previous = setProfiler(profiler)
+    try:
+        with profiler.profiling(), span("worker"):
+            result = function(*arguments)
+    finally:
+        setProfiler(previous)
+    return result, profiler.report(includeProfileStats=True)
+
+def LoadFilesInPool(pool, workerCount, modelFilePaths, cacheSettings, textureLoading, meshFilter, loaded):
+    #models are parsed one per task, then the textures of each 3DT are decoded in batches spread over the workers.
+    #results are yielded once all of a file's textures are back, and their paths added to loaded
+    profileSettings = getProfiler().settings()
+    def submit(function, *arguments):
+        return pool.submit(runProfiled, profileSettings, function, *arguments)
+
+    pending = {submit(LoadModelFile, modelFilePath, cacheSettings, meshFilter): (modelFilePath, None) for modelFilePath in modelFilePaths}
+    files = dict() #model file path: [modelData, textureImages, batches left]
+    while len(pending) > 0:
+        done = wait(pending, return_when=FIRST_COMPLETED)[0]
+        for future in done:
+            modelFilePath, batch = pending.pop(future)
+            result, report = future.result()
+            getProfiler().merge(report)
+            if batch is None:
+                modelData = result
+                if not os.path.exists(textureFilePath(modelFilePath)):
+                    files[modelFilePath] = [modelData, None, 0]
+                else:
+                    materials = modelData["materials"]
+                    batches = textureBatches(materials, texturesToDecode(modelData, textureLoading), workerCount)
+                    files[modelFilePath] = [modelData, [None] * len(materials), len(batches)]
+                    for batch in batches:
+                        pending[submit(LoadTextureBatch, textureFilePath(modelFilePath), materials, batch, cacheSettings)] = (modelFilePath, batch)
+            else:
+                for index, imageData in result:
+                    files[modelFilePath][1][index] = imageData
+                files[modelFilePath][2] -= 1
+            if files[modelFilePath][2] == 0:
+                modelData, textureImages, batchesLeft = files.pop(modelFilePath)
+                loaded.add(modelFilePath)
+                yield modelFilePath, modelData, textureImages
+
+def LoadFiles(modelFilePaths, cacheSettings = None, workerCount = 0, textureLoading = TEXTURES_ALL, meshFilter = None):
+    #yields LoadFile results as they become ready. with workerCount above 1 and at least POOL_MIN_FILES files, models
+    #and textures are loaded in a process pool, workerCount 0 meaning one process per core, up to one per file
+    if workerCount <= 0:
+        workerCount = min(os.cpu_count() or 1, len(modelFilePaths))
+    workerCount = min(workerCount, 61) #61 is the most windows supports
+    loaded = set()
+    if workerCount > 1 and len(modelFilePaths) >= POOL_MIN_FILES:
+        try:
+            #spawned rather than forked, forking blender with its threads running isn't safe
+            with ProcessPoolExecutor(max_workers=workerCount, mp_context=multiprocessing.get_context("spawn")) as pool:
+                yield from LoadFilesInPool(pool, workerCount, modelFilePaths, cacheSettings, textureLoading, meshFilter, loaded)
+        except (BrokenProcessPool, OSError) as error:
+            log(SUMMARY, "parallel loading failed ({0}), loading the remaining files one by one", error)
+    for modelFilePath in modelFilePaths:
+        if modelFilePath not in loaded:
+            yield LoadFile(modelFilePath, cacheSettings, textureLoading, meshFilter)
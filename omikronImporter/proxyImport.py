@@ -0,0 +1,161 @@
+# stand-ins made from the mesh descriptors of a file only, replaced by the real geometry on demand
+import os # for path stuff
+import numpy as np
+import bpy
+from bpy.props import BoolProperty
+
+from .omikronWorkers import *
+from .blenderImporter import ImportModels, ImportTextures, isShadowFile
+from .sharedMaterials import SharedDatablocks
+from .omikronProfiling import span, count, log, SUMMARY
+
+PROXY_PATH_PROPERTY = "omikron_proxy_path" #3DO file a proxy stands for
+PROXY_MESHES_PROPERTY = "omikron_proxy_meshes" #indices of the meshes of the file it stands for
+PROXY_CACHE_PROPERTY = "omikron_proxy_cache" #cache settings of the import that created it
+BOX_MESH_NAME = "omikron_proxy_box"
+
+def boxMesh():
+    #unit cube centered on the origin, shared by every box proxy
+    mesh = bpy.data.meshes.get(BOX_MESH_NAME)
+    if mesh is None:
+        corners = [(x, y, z) for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)]
+        faces = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+        mesh = bpy.data.meshes.new(BOX_MESH_NAME)
+        mesh.from_pydata(corners, [], faces)
+    return mesh
+
+def tagProxy(object, modelFilePath, meshes, cacheSettings):
+    object[PROXY_PATH_PROPERTY] = modelFilePath
+    object[PROXY_MESHES_PROPERTY] = list(meshes)
+    object[PROXY_CACHE_PROPERTY] = {
+        "cacheDirectory": cacheSettings[0] if cacheSettings is not None else "",
+        "cacheSize": float(cacheSettings[1]) if cacheSettings is not None else 0.0, #floats, as integer properties are 32 bits
+    }
+
+def proxyCacheSettings(proxy):
+    #None when the proxy was imported without a cache
+    source = proxy.get(PROXY_CACHE_PROPERTY)
+    if source is None or source["cacheDirectory"] == "":
+        return None
+    return source["cacheDirectory"], int(source["cacheSize"])
+
+def proxyCollection(objectName):
+    collection = bpy.data.collections.new(objectName + "_proxies")
+    bpy.context.scene.collection.children.link(collection)
+    return collection
+
+def createBoxProxies(modelFilePath, meshDescriptors, meshes, cacheSettings):
+    #an object per mesh, all instancing the same cube
+    collection = proxyCollection(modelObjectName(modelFilePath))
+    mesh = boxMesh()
+    for i in meshes:
+        low, high = meshBounds(meshDescriptors[i])
+        object = bpy.data.objects.new(meshDescriptors[i].name, mesh)
+        object.location = (low + high) * 0.5
+        object.scale = high - low
+        object.display_type = 'BOUNDS'
+        tagProxy(object, modelFilePath, [i], cacheSettings)
+        collection.objects.link(object)
+    count("proxies", len(meshes))
+
+def createPointProxy(modelFilePath, meshDescriptors, meshes, cacheSettings):
+    #a single object per file, with a vertex at the position of each mesh and its bounds as attributes
+    objectName = modelObjectName(modelFilePath)
+    bounds = [meshBounds(meshDescriptors[i]) for i in meshes]
+    mesh = bpy.data.meshes.new(objectName + "_proxy")
+    mesh.vertices.add(len(meshes))
+    mesh.vertices.foreach_set("co", np.array([meshDescriptors[i].position for i in meshes], dtype=np.float32).ravel())
+    for name, values in (("boxMin", [low for low, high in bounds]), ("boxMax", [high for low, high in bounds])):
+        attribute = mesh.attributes.new(name, 'FLOAT_VECTOR', 'POINT')
+        attribute.data.foreach_set("vector", np.array(values, dtype=np.float32).ravel())
+    mesh.attributes.new("flags", 'INT', 'POINT').data.foreach_set("value", [meshDescriptors[i].flags & 0x7fffffff for i in meshes])
+    mesh.update()
+    object = bpy.data.objects.new(objectName + "_proxy", mesh)
+    tagProxy(object, modelFilePath, meshes, cacheSettings)
+    bpy.context.scene.collection.objects.link(object)
+    count("proxies")
+
+def createProxies(modelFilePath, proxyType, meshFilter = None, cacheSettings = None):
+    #proxyType is 'BOXES' or 'POINTS'. only the header and mesh descriptors are read
+    #cacheSettings, None or (cacheDirectory, cacheSize in bytes), are kept for replaceProxies
+    with span("scan"):
+        header, materials, meshDescriptors = scanModelFile(modelFilePath)
+    selected = selectMeshes(meshDescriptors, meshFilter)
+    meshes = [i for i, meshDescriptor in enumerate(meshDescriptors) if selected[i] and isDisplayed(meshDescriptor)]
+    if len(meshes) == 0:
+        return
+    with span("proxies"):
+        if proxyType == 'POINTS':
+            createPointProxy(modelFilePath, meshDescriptors, meshes, cacheSettings)
+        else:
+            createBoxProxies(modelFilePath, meshDescriptors, meshes, cacheSettings)
+
+def replaceProxies(proxies, useCache = True, reuseMaterials = True):
+    #imports the meshes the proxies stand for, file by file, and removes the proxies
+    #with useCache, each file goes through the cache of the import that created its proxies, if it had one
+    files = dict() #model file path: mesh indices
+    cacheSettings = dict() #model file path: cache settings
+    for proxy in proxies:
+        files.setdefault(proxy[PROXY_PATH_PROPERTY], set()).update(proxy[PROXY_MESHES_PROPERTY])
+        cacheSettings.setdefault(proxy[PROXY_PATH_PROPERTY], proxyCacheSettings(proxy) if useCache else None)
+    shared = SharedDatablocks() if reuseMaterials else None
+    replaced = set()
+    for modelFilePath, meshes in files.items():
+        if not os.path.exists(modelFilePath):
+            log(SUMMARY, "{0} is missing, its proxies are kept", modelFilePath)
+            continue
+        modelCache, textureCache = openCaches(*cacheSettings[modelFilePath]) if cacheSettings[modelFilePath] is not None else (None, None)
+        with span("replace"), MappedFile(modelFilePath) as model_in:
+            mesh, materials, shaders = ImportModels(model_in, modelObjectName(modelFilePath), True, modelCache, False, MeshFilter((), 0, None, tuple(sorted(meshes))))
+        if os.path.exists(textureFilePath(modelFilePath)):
+            with span("build materials"), MappedFile(textureFilePath(modelFilePath)) as textures_in:
+                textureImages = LoadTextures(textures_in, materials, textureCache, usedMaterials(shaders))
+                textureHashes = HashTextures(textureFilePath(modelFilePath), materials) if shared is not None else None
+                ImportTextures(mesh, materials, shaders, textureImages, None, shared, textureHashes, isShadowFile(modelFilePath))
+        replaced.add(modelFilePath)
+        log(SUMMARY, "replaced the proxies of {0}", modelObjectName(modelFilePath))
+
+    for proxy in proxies:
+        if proxy[PROXY_PATH_PROPERTY] in replaced:
+            collections = list(proxy.users_collection)
+            bpy.data.objects.remove(proxy)
+            for collection in collections:
+                if collection.name.endswith("_proxies") and len(collection.all_objects) == 0:
+                    bpy.data.collections.remove(collection)
+    return len(replaced)
+
+class ReplaceOmikronProxies(bpy.types.Operator):
+    bl_idname = "import_omikron.replace_proxies"
+    bl_label = "Replace Omikron proxies"
+    bl_description = "Import the geometry of the selected Omikron proxies in their place"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    use_cache: BoolProperty(
+        name="Use cache",
+        description="Go through the on-disk cache of parsed models and decoded textures the proxies were imported with, if any",
+        default=True,
+    )
+
+    reuse_materials: BoolProperty(
+        name="Reuse materials",
+        description="Share images and materials with identical textures and shading, including those of earlier imports, instead of creating copies",
+        default=True,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return any(PROXY_PATH_PROPERTY in object for object in context.selected_objects)
+
+    def execute(self, context):
+        proxies = [object for object in context.selected_objects if PROXY_PATH_PROPERTY in object]
+        replaced = replaceProxies(proxies, self.use_cache, self.reuse_materials)
+        self.report({'INFO'}, "replaced the proxies of {0} files".format(replaced))
+        return {'FINISHED'}
+
+def register():
+    from bpy.utils import register_class
+    register_class(ReplaceOmikronProxies)
+
+def unregister():
+    from bpy.utils import unregister_class
+    unregister_class(ReplaceOmikronProxies)
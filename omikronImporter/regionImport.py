@@ -0,0 +1,104 @@
+# imports the models of an install that cover part of the world, found through the catalog
+import bpy
+from bpy.props import StringProperty, FloatProperty, FloatVectorProperty, EnumProperty
+from mathutils import Vector
+
+from .blenderImporter import OmikronImportOptions
+from .omikronCatalog import Catalog, defaultCatalogPath
+from .omikronProfiling import span, log, SUMMARY
+
+def selectionBounds(objects):
+    corners = [object.matrix_world @ Vector(corner) for object in objects for corner in object.bound_box]
+    return [min(corner[axis] for corner in corners) for axis in range(3)], [max(corner[axis] for corner in corners) for axis in range(3)]
+
+class ImportOmikronRegion(bpy.types.Operator, OmikronImportOptions):
+    bl_idname       = "import_omikron.region";
+    bl_label        = "import 3DO region";
+    bl_description  = "Import every 3DO file of the chosen install directory whose bounds meet the 3D cursor, the selection or a box"
+    bl_options      = {'PRESET'};
+
+    directory: StringProperty(
+        name="Install directory",
+        description="Directory whose 3DO files, and those of its subdirectories, are kept in the catalog",
+        subtype='DIR_PATH',
+    )
+
+    region: EnumProperty(
+        name="Region",
+        description="Part of the world whose models are imported",
+        items=(
+            ('CURSOR', "3D cursor", "Models around the 3D cursor"),
+            ('SELECTED', "Selection", "Models around the bounds of the selected objects"),
+            ('BOX', "Box", "Models meeting the box from Box min to Box max"),
+        ),
+        default='CURSOR',
+    )
+
+    distance: FloatProperty(
+        name="Distance",
+        description="How far around the cursor, selection or box models are still imported",
+        default=0.0,
+        min=0.0,
+        subtype='DISTANCE',
+    )
+
+    box_min: FloatVectorProperty(
+        name="Box min",
+        subtype='XYZ',
+    )
+
+    box_max: FloatVectorProperty(
+        name="Box max",
+        subtype='XYZ',
+    )
+
+    catalog_path: StringProperty(
+        name="Catalog",
+        description="SQLite catalog of the install, updated with the files changed since the last import. Leave empty to keep it next to the cache",
+        subtype='FILE_PATH',
+        default="",
+    )
+
+    def regionBounds(self, context):
+        if self.region == 'CURSOR':
+            low = high = context.scene.cursor.location
+        elif self.region == 'SELECTED' and len(context.selected_objects) > 0:
+            low, high = selectionBounds(context.selected_objects)
+        elif self.region == 'BOX':
+            low, high = self.box_min, self.box_max
+        else:
+            return None
+        return [x - self.distance for x in low], [x + self.distance for x in high]
+
+    def modelFilePaths(self):
+        catalogPath = bpy.path.abspath(self.catalog_path) if self.catalog_path != "" else defaultCatalogPath()
+        with span("catalog"), Catalog(catalogPath) as catalog:
+            catalog.update(self.directory)
+            modelFilePaths = catalog.filesIntersecting(*self.bounds, self.directory)
+        log(SUMMARY, "{0} files in the region", len(modelFilePaths))
+        return modelFilePaths
+
+    def invoke(self, context, event):
+        #only a directory is picked in the file browser
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        self.bounds = self.regionBounds(context)
+        if self.bounds is None:
+            self.report({'ERROR'}, "no object selected")
+            return {'CANCELLED'}
+        return OmikronImportOptions.execute(self, context)
+
+def menu_func(self, context):
+    self.layout.operator(ImportOmikronRegion.bl_idname, text="Omikron region (catalog of 3DO files)");
+
+def register():
+    from bpy.utils import register_class
+    register_class(ImportOmikronRegion)
+    bpy.types.TOPBAR_MT_file_import.append(menu_func)
+
+def unregister():
+    from bpy.utils import unregister_class
+    unregister_class(ImportOmikronRegion)
+    bpy.types.TOPBAR_MT_file_import.remove(menu_func)
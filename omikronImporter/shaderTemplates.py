@@ -0,0 +1,146 @@
+# node groups holding the shading of imported materials, one per combination of shader flags.
+# each material only gets its image texture node and an instance of the group matching its flags
+import bpy
+
+from .omikronFormat import vertexLit, alphablending, alphaTesting, mirror, substractive, environmentMapped
+from .omikronProfiling import count
+
+TEMPLATE_KEY_PROPERTY = "omikron_shader_template"
+
+templates = dict() #key: node group, kept for the whole session
+
+def templateKey(shaderFlags, isShadow, colorAttribute):
+    #only the flags the node tree depends on, in the order ImportTextures checks them
+    if isShadow:
+        return "shadows"
+    names = ["vertexLit" + ("Attribute" if colorAttribute else "")] if shaderFlags & vertexLit != 0 else ["diffuse"]
+    if shaderFlags & alphablending != 0:
+        names.append("alphablending")
+    elif shaderFlags & alphaTesting != 0:
+        names.append("alphaTesting")
+    elif shaderFlags & mirror != 0:
+        names.append("mirror" + ("Substractive" if shaderFlags & substractive != 0 else ""))
+    elif shaderFlags & environmentMapped != 0:
+        names.append("environmentMapped")
+    return " ".join(names)
+
+def materialSettings(shaderFlags, isShadow):
+    #what the material itself needs besides its nodes
+    if isShadow or shaderFlags & alphablending != 0:
+        return {"blend_method": 'BLEND', "shadow_method": 'NONE'}
+    if shaderFlags & alphaTesting != 0:
+        return {"blend_method": 'CLIP', "alpha_threshold": 0.999, "shadow_method": 'CLIP'}
+    return dict()
+
+def buildTemplate(name, shaderFlags, isShadow, colorAttribute):
+    #texture color and alpha in, shader out
+    group = bpy.data.node_groups.new(name, "ShaderNodeTree")
+    group.inputs.new("NodeSocketColor", "Color")
+    group.inputs.new("NodeSocketFloat", "Alpha")
+    group.outputs.new("NodeSocketShader", "Shader")
+    nodes = group.nodes
+    links = group.links
+    inputNode = nodes.new("NodeGroupInput")
+    outputNode = nodes.new("NodeGroupOutput")
+
+    if isShadow:
+        #material cheat for shadow
+        transparentNode =nodes.new("ShaderNodeBsdfTransparent")
+        mixNode =nodes.new("ShaderNodeMixShader")
+        links.new(mixNode.inputs[0], inputNode.outputs["Color"]) #texture color as factor
+        links.new(mixNode.inputs[1], transparentNode.outputs[0])
+        links.new(outputNode.inputs[0], mixNode.outputs[0])
+        return group
+
+    #first decide between using vertex lighting or diffuse shader
+    if shaderFlags & vertexLit != 0:
+        if not colorAttribute:
+            vColorNode = nodes.new("ShaderNodeVertexColor")
+            vColorNode.layer_name = 'DefaultColors'
+        else:
+            #colors stored per vertex by fillPointAttributes are read as a generic attribute
+            vColorNode = nodes.new("ShaderNodeAttribute")
+            vColorNode.attribute_name = 'DefaultColors'
+        diffuseNode = nodes.new("ShaderNodeMixRGB")
+        diffuseNode.blend_type = 'MULTIPLY'
+
+        diffuseNode.inputs[0].default_value = 0.9 #0.7 #blend factor
+        links.new(diffuseNode.inputs[2], vColorNode.outputs[0])
+        links.new(diffuseNode.inputs[1], inputNode.outputs["Color"])
+    else:
+        diffuseNode = nodes.new('ShaderNodeBsdfDiffuse')
+        links.new(diffuseNode.inputs[0], inputNode.outputs["Color"])
+
+    #then decide on possibility of alpha or reflections
+    if shaderFlags & alphablending != 0:
+        transparentNode =nodes.new("ShaderNodeBsdfTransparent")
+        addNode =nodes.new("ShaderNodeAddShader")
+        links.new(addNode.inputs[0], transparentNode.outputs[0])
+        links.new(addNode.inputs[1], diffuseNode.outputs[0])
+        links.new(outputNode.inputs[0], addNode.outputs[0])
+    elif shaderFlags & alphaTesting != 0:
+        transparentNode =nodes.new("ShaderNodeBsdfTransparent")
+        mixNode =nodes.new("ShaderNodeMixShader")
+        links.new(mixNode.inputs[0], inputNode.outputs["Alpha"]) #texture alpha as factor
+        links.new(mixNode.inputs[1], transparentNode.outputs[0])
+        links.new(mixNode.inputs[2], diffuseNode.outputs[0])
+        links.new(outputNode.inputs[0], mixNode.outputs[0])
+    elif shaderFlags & mirror != 0:
+        glossNode = nodes.new("ShaderNodeBsdfGlossy")
+        glossNode.inputs["Roughness"].default_value = 0
+        if shaderFlags & substractive != 0:
+            invertNode =nodes.new("ShaderNodeInvert")
+            links.new(invertNode.inputs[1], diffuseNode.outputs[0])
+            links.new(glossNode.inputs[0], invertNode.outputs[0])
+            links.new(outputNode.inputs[0], glossNode.outputs[0])
+        else:
+            #assuming additive
+            addNode =nodes.new("ShaderNodeAddShader")
+            links.new(addNode.inputs[0], glossNode.outputs[0])
+            links.new(addNode.inputs[1], diffuseNode.outputs[0])
+            links.new(outputNode.inputs[0], addNode.outputs[0])
+    elif shaderFlags & environmentMapped != 0:
+        glossNode = nodes.new("ShaderNodeBsdfPrincipled")
+        glossNode.inputs["Base Color"].default_value = (0.3,0.3,0.3,0)
+        glossNode.inputs["Roughness"].default_value = 0
+        glossNode.inputs["Specular"].default_value = 1
+        glossNode.inputs["Metallic"].default_value = 1
+
+        links.new(glossNode.inputs["Emission"], diffuseNode.outputs[0])
+        links.new(outputNode.inputs[0], glossNode.outputs[0])
+        diffuseNode.inputs[0].default_value = 1 #0.9
+    else:
+        links.new(outputNode.inputs[0], diffuseNode.outputs[0])
+    return group
+
+def isAlive(group):
+    #references to datablocks outlive them when they're deleted or another file is opened
+    try:
+        return group.name is not None
+    except ReferenceError:
+        return False
+
+def templateGroup(shaderFlags, isShadow, colorAttribute):
+    #node group for the flags, from this session, from the blend file, or built now
+    key = templateKey(shaderFlags, isShadow, colorAttribute)
+    group = templates.get(key)
+    if group is None or not isAlive(group):
+        group = next((group for group in bpy.data.node_groups if group.get(TEMPLATE_KEY_PROPERTY) == key), None)
+        if group is None:
+            group = buildTemplate("Omikron " + key, shaderFlags, isShadow, colorAttribute)
+            group[TEMPLATE_KEY_PROPERTY] = key
+            group.use_fake_user = True #kept while no material uses it, to be reused by the next import
+            count("shader templates built")
+        templates[key] = group
+    return group
+
+def applyTemplate(mat, textureNode, shaderFlags, isShadow, colorAttribute):
+    #plugs textureNode into an instance of the template, feeding the material output
+    nodes = mat.node_tree.nodes
+    groupNode = nodes.new("ShaderNodeGroup")
+    groupNode.node_tree = templateGroup(shaderFlags, isShadow, colorAttribute)
+    mat.node_tree.links.new(groupNode.inputs["Color"], textureNode.outputs[0])
+    mat.node_tree.links.new(groupNode.inputs["Alpha"], textureNode.outputs[1])
+    mat.node_tree.links.new(nodes['Material Output'].inputs[0], groupNode.outputs[0])
+    for setting, value in materialSettings(shaderFlags, isShadow).items():
+        setattr(mat, setting, value)
@@ -0,0 +1,35 @@
+# reuse of images and materials between imports, found by the content of their texture and their shader flags,
+# and of the meshes instanced by geometryHashes
+import bpy
+
+IMAGE_KEY_PROPERTY = "omikron_texture_hash"
+MATERIAL_KEY_PROPERTY = "omikron_material_key"
+GEOMETRY_KEY_PROPERTY = "omikron_geometry_hash"
+
+def materialKey(textureHash, shaderFlags, isShadow, colorAttribute):
+    #everything the node tree built by ImportTextures depends on, colorAttribute picking the vertex color node of the template
+    return "{0}|{1}|{2}|{3}".format(textureHash, shaderFlags, int(isShadow), int(colorAttribute))
+
+class SharedDatablocks:
+    #images and materials of the blend file that carry a key, gathered once per import
+    #without scanBlendFile, only those added afterwards are shared, such as between the tiles of one file
+    def __init__(self, scanBlendFile = True):
+        self.images = dict()
+        self.materials = dict()
+        self.meshes = dict()
+        if scanBlendFile:
+            self.images = {image[IMAGE_KEY_PROPERTY]: image for image in bpy.data.images if IMAGE_KEY_PROPERTY in image}
+            self.materials = {material[MATERIAL_KEY_PROPERTY]: material for material in bpy.data.materials if MATERIAL_KEY_PROPERTY in material}
+            self.meshes = {mesh[GEOMETRY_KEY_PROPERTY]: mesh for mesh in bpy.data.meshes if GEOMETRY_KEY_PROPERTY in mesh}
+
+    def addImage(self, key, image):
+        image[IMAGE_KEY_PROPERTY] = key
+        self.images[key] = image
+
+    def addMaterial(self, key, material):
+        material[MATERIAL_KEY_PROPERTY] = key
+        self.materials[key] = material
+
+    def addMesh(self, key, mesh):
+        mesh[GEOMETRY_KEY_PROPERTY] = key
+        self.meshes[key] = mesh
@@ -0,0 +1,127 @@
+# the per-field reads the struct and numpy readers of omikronFormat replaced, kept as references for the tests
+import struct
+
+from omikronImporter.omikronFormat import Vector3, scalefactor
+
+def readInt32(file_object):
+    return struct.unpack("<i", file_object.read(4))[0]
+
+def readUInt32(file_object):
+    return struct.unpack("<I", file_object.read(4))[0]
+
+def readUByte(file_object):
+    return struct.unpack("<B", file_object.read(1))[0]
+
+def readFloat(file_object):
+    return struct.unpack("<f", file_object.read(4))[0]
+
+def readUInt16(file_object):
+    return struct.unpack("<H", file_object.read(2))[0]
+
+def readUInt64(file_object):
+    return struct.unpack("<Q", file_object.read(8))[0]
+
+def readUBytes(file_object, count):
+    xs = bytearray()
+    for i in range(count):
+        xs.append(readUByte(file_object))
+    return xs
+
+def readString(file_object, length = 20):
+    return readUBytes(file_object, length).decode("cp858").rstrip('\x00')
+
+def readVector3(file_object):
+    x = readFloat(file_object)
+    z = -readFloat(file_object)
+    y = readFloat(file_object)
+    return Vector3([x,y,z])
+
+def referenceHeader(file_object):
+    header = dict()
+    header["signature"] = readString(file_object, 4)
+    header["versionMajor"] = readUInt32(file_object)
+    header["versionMinor"] = readUInt32(file_object)
+    for name in ("materialsOffset", "verticesOffset", "trianglesOffset", "rectanglesOffset", "meshesOffset", "doorsOffset", "camerasOffset", "lightsOffset"):
+        header[name] = readUInt32(file_object)
+    header["reserved"] = readUBytes(file_object, 180)
+    for name in ("unknown1", "unknown2", "triangleCount", "rectangleCount", "vertexCount"):
+        header[name] = readUInt32(file_object)
+    header["reserved2"] = readUInt64(file_object)
+    for name in ("materialCount", "unknown3", "reserved3", "cameraCount", "meshCount", "doorCount", "lightCount", "lightsUnknown1", "lightsUnknown2"):
+        header[name] = readUInt32(file_object)
+    header["unknown4"] = readUBytes(file_object, 84)
+    return header
+
+def referenceMaterial(file_object):
+    material = dict()
+    material["name"] = readString(file_object)
+    material["BMPfile"] = readString(file_object)
+    material["TGAfile"] = readString(file_object)
+    material["dataSize"] = readUInt32(file_object)
+    material["reserved"] = readUInt64(file_object)
+    material["BPP"] = readUInt32(file_object)
+    material["width"] = readUInt16(file_object)
+    material["height"] = readUInt16(file_object)
+    return material
+
+def referenceMeshDescriptor(file_object):
+    meshDescriptor = dict()
+    for name in ("flags", "moverFlags", "meshID", "scriptID"):
+        meshDescriptor[name] = readUInt32(file_object)
+    meshDescriptor["name"] = readString(file_object)
+    meshDescriptor["position"] = readVector3(file_object) * scalefactor
+    for name in ("parentID", "firstChildID", "nextSiblingID"):
+        meshDescriptor[name] = readInt32(file_object)
+    for name in ("unknown07_count1", "vertexCount", "triangleCount", "rectangleCount"):
+        meshDescriptor[name] = readUInt32(file_object)
+    for name in ("unknown08", "unknown09", "unknown10", "unknown11"):
+        meshDescriptor[name] = readFloat(file_object)
+    meshDescriptor["boxExtentNeg"] = readVector3(file_object) * scalefactor
+    meshDescriptor["boxExtentPos"] = readVector3(file_object) * scalefactor
+    for name in ("unknown18", "unknown19", "unknown20"):
+        meshDescriptor[name] = readFloat(file_object)
+    meshDescriptor["bonePosition"] = readVector3(file_object) * scalefactor
+    return meshDescriptor
+
+def referenceRectangles(rectangleCount, file_object):
+    rectangles = []
+    for i in range(rectangleCount):
+        rectangle = dict()
+        for name in ("vertex1", "vertex2", "vertex3", "vertex4"):
+            rectangle[name] = readUInt16(file_object)
+        for name in ("u1", "v1", "u2", "v2", "u3", "v3", "u4", "v4"):
+            rectangle[name] = readUByte(file_object)
+        for name in ("material", "s2", "s3", "s4"):
+            rectangle[name] = readInt32(file_object)
+        rectangles.append(rectangle)
+    return rectangles
+
+def referenceTriangles(triangleCount, file_object):
+    triangles = []
+    for i in range(triangleCount):
+        triangle = dict()
+        for name in ("vertex1", "vertex2", "vertex3"):
+            triangle[name] = readUInt16(file_object)
+        for name in ("u1", "v1", "u2", "v2", "u3", "v3"):
+            triangle[name] = readUByte(file_object)
+        for name in ("material", "s2", "s3", "s4"):
+            triangle[name] = readInt32(file_object)
+        for name in ("vertex1", "vertex2", "vertex3"):
+            triangle[name + "parented"] = triangle[name] >> 15 == 1
+            triangle[name] = triangle[name] & 1023
+        triangles.append(triangle)
+    return triangles
+
+def referenceLight(file_object):
+    light = dict()
+    light["flags"] = readUInt32(file_object)
+    light["name"] = readString(file_object)
+    light["float 1,2"] = [readFloat(file_object), readFloat(file_object)]
+    light["intensity"] = readFloat(file_object)
+    light["angles"] = [readFloat(file_object), readFloat(file_object)]
+    light["color"]= [readUByte(file_object)/255,readUByte(file_object)/255,readUByte(file_object)/255,readUByte(file_object)/255]
+    for i in range(6):
+        light["position"+str(i)] = readVector3(file_object) * scalefactor
+        light["unknown"+str(i)] = readUBytes(file_object, 20)
+    light["unknown"] = readUBytes(file_object, 64)
+    return light
@@ -0,0 +1,124 @@
+# the numpy readers and duplicate face fix of omikronFormat, checked against the per-record code they replaced
+import os # for path stuff
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+import numpy as np
+import pytest
+
+from omikronImporter.omikronFormat import *
+from syntheticFiles import writeSyntheticFiles
+from referenceReaders import readUInt32, readUByte, readVector3, referenceTriangles, referenceRectangles
+
+def referenceVertices(file_object, header, meshDescriptors):
+    file_object.seek(header["verticesOffset"])
+    rawVertices = []
+    for i in range(sum(meshDescriptor.vertexCount for meshDescriptor in meshDescriptors)):
+        vertex = dict()
+        vertex["bone"] = 0
+        for j in range(1, len(meshDescriptors)):
+            if i >= meshDescriptors[j]["verticesOffset"]:
+                vertex["bone"]+=1
+        vertex["position"] = readVector3(file_object) * scalefactor
+        vertex["normal"] = readVector3(file_object)
+        vertex["t1"] = readUInt32(file_object)
+        B, G, R, A = [readUByte(file_object) for j in range(4)]
+        vertex["color_ARGB"] = [R/255, G/255, B/255, A/255]
+        rawVertices.append(vertex)
+    return rawVertices
+
+def referenceFixDuplicateFaces(faces, vertices):
+    faceSet = set()
+    for i, face in enumerate(faces):
+        faceTuple = tuple(sorted(face))
+        if faceTuple in faceSet:
+            baseIndex = len(vertices)
+            newface = list(range(baseIndex, baseIndex+len(faceTuple)))
+            faces[i] = newface
+            for index in face:
+                vertices.append(vertices[index].copy())
+        else:
+            faceSet.add(faceTuple)
+
+@pytest.fixture(scope="module")
+def model(tmp_path_factory):
+    modelFilePath = str(tmp_path_factory.mktemp("models") / "synthetic.3do")
+    writeSyntheticFiles(modelFilePath, meshCount = 8, verticesPerMesh = 30, trianglesPerMesh = 25, rectanglesPerMesh = 15,
+        materialCount = 2, textureSize = 16, seed = 2)
+    with open(modelFilePath, "rb") as model_in:
+        header = readHeader(model_in)
+        meshDescriptors = readMeshDescriptors(model_in, header)
+        assignDataOffsets(meshDescriptors)
+        yield model_in, header, meshDescriptors
+
+def test_vertices(model):
+    model_in, header, meshDescriptors = model
+    vertices = loadVertexArrays(model_in, header, meshDescriptors)
+    reference = referenceVertices(model_in, header, meshDescriptors)
+    assert len(vertices["bone"]) == len(reference) == 8 * 30
+    assert vertices["bone"].tolist() == [vertex["bone"] for vertex in reference]
+    assert vertices["t1"].tolist() == [vertex["t1"] for vertex in reference]
+    for field in ("position", "normal", "color_ARGB"):
+        np.testing.assert_allclose(vertices[field], np.array([list(vertex[field]) for vertex in reference]), rtol=1e-6, atol=1e-7)
+
+@pytest.mark.parametrize("reader, referenceReader, offset, count, corners", [
+    (ReadTriangleArrays, referenceTriangles, "trianglesOffset", "triangleCount", 3),
+    (ReadRectangleArrays, referenceRectangles, "rectanglesOffset", "rectangleCount", 4),
+])
+def test_polygons(model, reader, referenceReader, offset, count, corners):
+    model_in, header, meshDescriptors = model
+    model_in.seek(header[offset])
+    polygons = reader(header[count], model_in)
+    model_in.seek(header[offset])
+    reference = referenceReader(header[count], model_in)
+    names = range(1, corners + 1)
+    assert polygons["vertices"].tolist() == [[polygon["vertex%d" % i] for i in names] for polygon in reference]
+    assert polygons["uv"].tolist() == [[[polygon["u%d" % i], polygon["v%d" % i]] for i in names] for polygon in reference]
+    if corners == 3:
+        assert polygons["parented"].tolist() == [[polygon["vertex%dparented" % i] for i in names] for polygon in reference]
+        assert polygons["parented"].any()
+    for field in ("material", "s2", "s3", "s4"):
+        assert polygons[field].tolist() == [polygon[field] for polygon in reference]
+
+def facesWithDuplicates(rnd, vertexCount, faceCount):
+    #random triangles and quads, a third of them repeating an earlier face with its corners shuffled, rotated or not
+    faces = []
+    for i in range(faceCount):
+        if len(faces) > 0 and rnd.random() < 0.33:
+            face = list(rnd.choice(faces))
+            transform = rnd.randrange(3)
+            if transform == 0:
+                rnd.shuffle(face)
+            elif transform == 1:
+                face = face[1:] + face[:1]
+        elif rnd.random() < 0.05:
+            index = rnd.randrange(vertexCount)
+            face = [index, index, rnd.randrange(vertexCount)] #degenerate
+        else:
+            face = rnd.sample(range(vertexCount), rnd.choice((3, 4)))
+        faces.append(face)
+    return faces
+
+@pytest.mark.parametrize("seed", range(20))
+def test_duplicate_faces(seed):
+    rnd = random.Random(seed)
+    vertexCount = rnd.randint(4, 40)
+    faces = facesWithDuplicates(rnd, vertexCount, rnd.randint(1, 200))
+    loopVertices = np.array([index for face in faces for index in face], dtype=np.int64)
+    loopTotals = np.array([len(face) for face in faces], dtype=np.int32)
+    fixedVertices, vertexSources = fixDuplicateFaces(loopVertices, loopTotals, vertexCount)
+
+    referenceFaces = [list(face) for face in faces]
+    vertices = [np.array([i]) for i in range(vertexCount)] #each vertex holds the index it is a copy of
+    referenceFixDuplicateFaces(referenceFaces, vertices)
+    assert fixedVertices.tolist() == [index for face in referenceFaces for index in face]
+    assert vertexSources.tolist() == [vertex[0] for vertex in vertices]
+    assert loopVertices.tolist() == [index for face in faces for index in face] #left as it was
+
+def test_no_faces():
+    fixedVertices, vertexSources = fixDuplicateFaces(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32), 3)
+    assert fixedVertices.tolist() == []
+    assert vertexSources.tolist() == [0, 1, 2]
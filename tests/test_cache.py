@@ -0,0 +1,41 @@
+# size limit of the on-disk cache
+import os # for path stuff
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from omikronImporter.omikronCache import DiskCache
+
+def entrySize(directory):
+    cache = DiskCache(str(directory), 1 << 30)
+    cache.store("probe", np.zeros(1000, dtype=np.uint8))
+    size = os.path.getsize(cache.path("probe"))
+    cache.clear()
+    return size
+
+def test_least_recently_used_evicted(tmp_path):
+    size = entrySize(tmp_path)
+    cache = DiskCache(str(tmp_path), size * 3)
+    for i in range(3):
+        cache.store(str(i), np.full(1000, i, dtype=np.uint8))
+    os.utime(cache.path("0"), (0, 0))
+    os.utime(cache.path("1"), (1, 1))
+    assert cache.load("1")[0] == 1 #now the most recently used
+    cache.store("3", np.full(1000, 3, dtype=np.uint8))
+    assert sorted(os.listdir(str(tmp_path))) == ["1.npy", "2.npy", "3.npy"]
+    assert cache.totalSize == size * 3
+
+def test_scans_only_past_the_limit(tmp_path, monkeypatch):
+    size = entrySize(tmp_path)
+    cache = DiskCache(str(tmp_path), size * 10)
+    scans = []
+    entries = cache.entries
+    monkeypatch.setattr(cache, "entries", lambda: scans.append(1) or entries())
+    for i in range(10):
+        cache.store(str(i), np.zeros(1000, dtype=np.uint8))
+    assert len(scans) == 1 #the first store, which finds out the size of the directory
+    cache.store("10", np.zeros(1000, dtype=np.uint8))
+    assert len(scans) == 2
+    assert len(os.listdir(str(tmp_path))) == 10
@@ -0,0 +1,159 @@
+# DecompressBuffer, checked against the byte at a time Decompress it replaced, and against the benchmarks' encoder
+import os # for path stuff
+import sys
+import io
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+import pytest
+
+from omikronImporter.omikronFormat import DecompressBuffer
+from syntheticFiles import Compress, syntheticIndexTexture
+from referenceReaders import readUByte, readUBytes
+
+def referenceDecompress(file_object, compressedSize, uncompressedSize):
+    startAddress = file_object.tell()
+    if compressedSize == 65536:
+        return readUBytes(file_object, compressedSize)
+    result = []
+    result.append(readUByte(file_object)) # first byte isn't compressed
+    currentByte = 1
+    while currentByte < uncompressedSize:
+        flags = readUByte(file_object)
+        for flagIndex in range(8):
+            CompressionFlag = (flags >> (7 - flagIndex) & 1) != 0
+            if CompressionFlag == True:
+                sequenceDescription = readUByte(file_object)
+                sequenceType = sequenceDescription & 3
+                sequenceSize = (sequenceDescription >> 2) + 3
+                offset = 0
+                if sequenceType == 0:
+                    offset = 1;
+                    sequenceSize -= 1
+                elif sequenceType == 1:
+                    offset = 1 + readUByte(file_object)
+                elif sequenceType == 2:
+                    offset = 1 + (readUByte(file_object) << 8) + readUByte(file_object)
+                elif sequenceType == 3:
+                    offset = 1 + readUByte(file_object) * 256 - 1
+                else:
+                    raise Exception("invalid flag")
+
+                for i in range(sequenceSize):
+                    if offset > currentByte:
+                        result.append(0)
+                    else:
+                        result.append(result[currentByte - offset])
+                    currentByte += 1
+                    if currentByte >= uncompressedSize:
+                        return result
+            else:
+                result.append(readUByte(file_object))
+                currentByte += 1
+                if (currentByte >= uncompressedSize):
+                    return result
+
+            currentAddress = file_object.tell()
+            if currentAddress - startAddress >= compressedSize:
+                return result
+    return result
+
+def decompressBoth(data, compressedSize, uncompressedSize):
+    #the block is followed by the 4 bytes Decompress reads past it
+    data = bytes(data) + bytes(4)
+    reference = bytes(referenceDecompress(io.BytesIO(data), compressedSize, uncompressedSize))
+    result = bytes(DecompressBuffer(data, compressedSize, uncompressedSize))
+    return reference, result
+
+def sequenceTypes(compressed, uncompressedSize):
+    #types of the sequences of a stream, walked without decoding it
+    types = set()
+    currentByte = 1
+    position = 1
+    while currentByte < uncompressedSize and position < len(compressed):
+        flags = compressed[position]
+        position += 1
+        for flagIndex in range(8):
+            if currentByte >= uncompressedSize or position >= len(compressed):
+                break
+            if flags & (0x80 >> flagIndex) != 0:
+                sequenceType = compressed[position] & 3
+                types.add(sequenceType)
+                currentByte += (compressed[position] >> 2) + (2 if sequenceType == 0 else 3)
+                position += (1, 2, 3, 2)[sequenceType]
+            else:
+                currentByte += 1
+                position += 1
+    return types
+
+@pytest.mark.parametrize("seed", range(200))
+def test_random_streams(seed):
+    rnd = random.Random(seed)
+    compressedSize = rnd.randint(2, 400)
+    uncompressedSize = rnd.randint(1, 2000)
+    data = bytes(rnd.randrange(256) for i in range(compressedSize))
+    try:
+        reference = bytes(referenceDecompress(io.BytesIO(data + bytes(4)), compressedSize, uncompressedSize))
+    except IndexError:
+        #type 3 sequence with a zero offset byte, which can't be decoded
+        with pytest.raises(Exception, match="invalid sequence offset"):
+            DecompressBuffer(data + bytes(4), compressedSize, uncompressedSize)
+        return
+    assert bytes(DecompressBuffer(data + bytes(4), compressedSize, uncompressedSize)) == reference
+
+def test_reference_before_first_pixel():
+    #a 5 pixel copy from 10 pixels back, right after the first pixel, is black
+    data = bytes([7, 0x80, (2 << 2) | 1, 9])
+    reference, result = decompressBoth(data, len(data), 6)
+    assert result == reference == bytes([7, 0, 0, 0, 0, 0])
+
+def test_partly_before_first_pixel():
+    #copy from 3 pixels back after 2 pixels: one black pixel, then pixels of the copy itself
+    data = bytes([7, 0x40, 8, (3 << 2) | 1, 2])
+    reference, result = decompressBoth(data, len(data), 8)
+    assert result == reference == bytes([7, 8, 0, 7, 8, 0, 7, 8])
+
+def test_ends_at_compressed_size():
+    #the block ends before uncompressedSize pixels were written
+    data = bytes([1, 0x00, 2, 3, 4, 5, 6, 7, 8, 9])
+    reference, result = decompressBoth(data, 5, 100)
+    assert result == reference == bytes([1, 2, 3, 4])
+
+def test_raw_block():
+    rnd = random.Random(0)
+    data = bytes(rnd.randrange(256) for i in range(65536))
+    reference, result = decompressBoth(data, 65536, 65536)
+    assert result == reference == data
+
+def test_compress_round_trip():
+    rnd = random.Random(0)
+    noise = bytes(rnd.randrange(256) for i in range(2000))
+    pattern = bytes(rnd.randrange(256) for i in range(10))
+    texture = (noise
+        + noise[-512:-492] #512 back, type 3
+        + noise[100:120] #1920 back, type 2
+        + bytes([5]) * 30 #run of the previous pixel, type 0
+        + pattern + pattern) #10 back, type 1
+    compressed = Compress(texture)
+    assert sequenceTypes(compressed, len(texture)) == {0, 1, 2, 3}
+    reference, result = decompressBoth(compressed, len(compressed), len(texture))
+    assert result == reference == texture
+
+@pytest.mark.parametrize("size", [16, 64, 128])
+def test_synthetic_texture_round_trip(size):
+    texture = bytes(syntheticIndexTexture(random.Random(size), size, size))
+    compressed = Compress(texture)
+    reference, result = decompressBoth(compressed, len(compressed), len(texture))
+    assert result == reference == texture
+
+@pytest.mark.parametrize("size", [65536, 65535, 60000])
+def test_incompressible_round_trip(size):
+    #only 256x256 textures can fall back to the uncompressed 65536 byte block
+    rnd = random.Random(size)
+    texture = bytes(rnd.randrange(256) for i in range(size))
+    compressed = Compress(texture)
+    assert (len(compressed) == 65536) == (size == 65536)
+    reference, result = decompressBoth(compressed, len(compressed), len(texture))
+    assert result == reference == texture
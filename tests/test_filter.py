@@ -0,0 +1,45 @@
+# ParseModel with a MeshFilter, checked against the unfiltered parse of the same file
+import os # for path stuff
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+import numpy as np
+import pytest
+
+from omikronImporter.omikronFormat import *
+from syntheticFiles import writeSyntheticFiles
+
+@pytest.fixture(scope="module")
+def modelFilePath(tmp_path_factory):
+    modelFilePath = str(tmp_path_factory.mktemp("models") / "synthetic.3do")
+    writeSyntheticFiles(modelFilePath, meshCount = 10, verticesPerMesh = 20, trianglesPerMesh = 15, rectanglesPerMesh = 10,
+        materialCount = 2, textureSize = 16, seed = 3)
+    return modelFilePath
+
+def test_descriptors_left_as_read(modelFilePath):
+    full = parseModelFile(modelFilePath)
+    filtered = parseModelFile(modelFilePath, meshFilter = MeshFilter((), 0, None, (2, 5, 7)))
+    assert [dict(meshDescriptor) for meshDescriptor in filtered["meshDescriptors"]] == [dict(meshDescriptor) for meshDescriptor in full["meshDescriptors"]]
+    assert filtered["selectedMeshes"] == [i in (2, 5, 7) for i in range(10)]
+    assert full["vertexRanges"] == [(i * 20, 20) for i in range(10)]
+
+    #the kept meshes, the selected ones and their skin parents, have the same vertices as in the whole model
+    first = 0
+    for i, (start, vertexCount) in enumerate(filtered["vertexRanges"]):
+        assert start == first
+        if filtered["selectedMeshes"][i]:
+            assert vertexCount == 20
+        if vertexCount > 0:
+            np.testing.assert_allclose(filtered["vertices"][start:start + vertexCount] + np.array(filtered["meshCenter"], dtype=np.float32),
+                full["vertices"][i * 20:i * 20 + 20] + np.array(full["meshCenter"], dtype=np.float32), rtol=1e-5, atol=1e-4)
+        first += vertexCount
+    assert first < 10 * 20
+
+def test_nothing_selected(modelFilePath):
+    modelData = parseModelFile(modelFilePath, meshFilter = MeshFilter(("no such mesh",), 0, None, None))
+    assert not any(modelData["selectedMeshes"])
+    assert modelData["vertexRanges"] == [(0, 0)] * 10
+    assert len(modelData["vertices"]) == len(modelData["loopTotals"]) == 0
+    assert [meshDescriptor.vertexCount for meshDescriptor in modelData["meshDescriptors"]] == [20] * 10
@@ -0,0 +1,78 @@
+# the table readers of omikronFormat, checked field for field against the per-field reads they replaced
+import os # for path stuff
+import sys
+import io
+import random
+import struct
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+import pytest
+
+from omikronImporter.omikronFormat import *
+from omikronImporter.omikronFormat import HEADER_STRUCT, HEADER_FIELDS, LIGHT_STRUCT, readLight
+from syntheticFiles import writeSyntheticFiles
+from referenceReaders import *
+
+@pytest.fixture(scope="module")
+def modelFilePath(tmp_path_factory):
+    modelFilePath = str(tmp_path_factory.mktemp("models") / "synthetic.3do")
+    writeSyntheticFiles(modelFilePath, meshCount = 12, verticesPerMesh = 40, trianglesPerMesh = 30, rectanglesPerMesh = 20,
+        materialCount = 3, textureSize = 32, seed = 1)
+    return modelFilePath
+
+def test_header(modelFilePath):
+    with open(modelFilePath, "rb") as model_in:
+        header = readHeader(model_in)
+        assert model_in.tell() == HEADER_STRUCT.size
+        model_in.seek(0)
+        reference = referenceHeader(model_in)
+    assert list(header) == list(HEADER_FIELDS)
+    assert header == reference
+
+def test_materials(modelFilePath):
+    with open(modelFilePath, "rb") as model_in:
+        header = readHeader(model_in)
+        materials = readMaterials(model_in, header)
+        model_in.seek(header["materialsOffset"])
+        reference = [referenceMaterial(model_in) for i in range(header["materialCount"])]
+    assert len(materials) == 3
+    assert [dict(material) for material in materials] == reference
+
+def test_mesh_descriptors(modelFilePath):
+    with open(modelFilePath, "rb") as model_in:
+        header = readHeader(model_in)
+        meshDescriptors = readMeshDescriptors(model_in, header)
+        model_in.seek(header["meshesOffset"])
+        reference = [referenceMeshDescriptor(model_in) for i in range(header["meshCount"])]
+    assert len(meshDescriptors) == 12
+    assert [dict(meshDescriptor) for meshDescriptor in meshDescriptors] == reference
+
+@pytest.mark.parametrize("reader, referenceReader, offset, count", [
+    (ReadTriangles, referenceTriangles, "trianglesOffset", "triangleCount"),
+    (ReadRectangles, referenceRectangles, "rectanglesOffset", "rectangleCount"),
+])
+def test_polygons(modelFilePath, reader, referenceReader, offset, count):
+    with open(modelFilePath, "rb") as model_in:
+        header = readHeader(model_in)
+        model_in.seek(header[offset])
+        polygons = reader(header[count], model_in)
+        end = model_in.tell()
+        model_in.seek(header[offset])
+        reference = referenceReader(header[count], model_in)
+        assert end == model_in.tell()
+    assert len(polygons) == header[count] > 0
+    assert polygons == reference
+
+def test_lights():
+    rnd = random.Random(0)
+    data = b"".join(struct.pack("<I20s5f4B", rnd.getrandbits(32), b"light%d" % i, *[rnd.uniform(-1000, 1000) for j in range(5)], *rnd.randbytes(4))
+        + b"".join(struct.pack("<3f", *[rnd.uniform(-1000, 1000) for k in range(3)]) + rnd.randbytes(20) for j in range(6))
+        + rnd.randbytes(64) for i in range(3))
+    assert len(data) == 3 * LIGHT_STRUCT.size
+    lights_in = io.BytesIO(data)
+    lights = [readLight(lights_in) for i in range(3)]
+    assert lights_in.tell() == len(data)
+    lights_in.seek(0)
+    assert lights == [referenceLight(lights_in) for i in range(3)]